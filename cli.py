@@ -13,6 +13,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 from dino_os.agent_core import Agent
 from dino_os.memory_layer import MemoryLayer
 from dino_os.scheduler import Scheduler
+from dino_os.job_store import SQLiteJobStore
+from dino_os.lease import SQLiteLease
 
 
 class DinoCLI:
@@ -21,7 +23,9 @@ class DinoCLI:
     def __init__(self):
         """Initialize the CLI."""
         self.memory = MemoryLayer()
-        self.scheduler = Scheduler()
+        # The lease keeps several "dino schedule run" workers from firing each job
+        self.scheduler = Scheduler(job_store=SQLiteJobStore(), misfire_grace_time=300,
+                                   lease=SQLiteLease())
         
     def run(self):
         """Run the CLI."""
@@ -63,6 +67,17 @@ class DinoCLI:
         memory_search = memory_subparsers.add_parser("search", help="Search memories")
         memory_search.add_argument("query", help="Search query")
         
+        memory_export = memory_subparsers.add_parser("export", help="Export memories to NDJSON")
+        memory_export.add_argument("path", help="Output file (.gz/.zst suffix compresses)")
+        memory_export.add_argument("--prefix", help="Only export keys with this prefix")
+        memory_export.add_argument("--compress", choices=["gzip", "zstd"],
+                                   help="Compression (default: inferred from suffix)")
+        
+        memory_import = memory_subparsers.add_parser("import", help="Import memories from NDJSON")
+        memory_import.add_argument("path", help="Input file (.gz/.zst suffix decompresses)")
+        memory_import.add_argument("--compress", choices=["gzip", "zstd"],
+                                   help="Compression (default: inferred from suffix)")
+        
         # scheduler command
         scheduler_parser = subparsers.add_parser("schedule", help="Scheduler operations")
         scheduler_subparsers = scheduler_parser.add_subparsers(dest="schedule_command")
@@ -74,6 +89,11 @@ class DinoCLI:
         
         scheduler_list = scheduler_subparsers.add_parser("list", help="List scheduled jobs")
         
+        scheduler_remove = scheduler_subparsers.add_parser("remove", help="Remove a scheduled job")
+        scheduler_remove.add_argument("job_id", help="Job ID")
+        
+        scheduler_subparsers.add_parser("run", help="Run scheduled jobs until interrupted")
+        
         args = parser.parse_args()
         
         if args.command is None:
@@ -198,6 +218,12 @@ class DinoCLI:
             print(f"Search results for '{args.query}':")
             for result in results:
                 print(f"  - {result['key']}: {result['value'][:50]}...")
+        elif args.memory_command == "export":
+            count = self.memory.export_ndjson(args.path, args.compress, args.prefix)
+            print(f"Exported {count} memories to {args.path}")
+        elif args.memory_command == "import":
+            count = self.memory.import_ndjson(args.path, args.compress)
+            print(f"Imported {count} memories from {args.path}")
     
     def _handle_scheduler(self, args) -> None:
         """Handle scheduler commands."""
@@ -209,6 +235,23 @@ class DinoCLI:
             print("Scheduled jobs:")
             for job in jobs:
                 print(f"  - {job['id']}: {job['type']} ({job['schedule']}) next: {job['next_run']}")
+        elif args.schedule_command == "remove":
+            if self.scheduler.remove_job(args.job_id):
+                print(f"Job removed: {args.job_id}")
+            else:
+                print(f"Job not found: {args.job_id}")
+        elif args.schedule_command == "run":
+            print(f"Running {len(self.scheduler.list_jobs())} scheduled jobs (Ctrl+C to stop)")
+            loop = asyncio.get_event_loop()
+            try:
+                loop.run_until_complete(self._run_scheduler())
+            except KeyboardInterrupt:
+                loop.run_until_complete(self.scheduler.stop())
+    
+    async def _run_scheduler(self) -> None:
+        """Run the scheduler until cancelled."""
+        await self.scheduler.start()
+        await asyncio.Event().wait()
 
 
 def main():
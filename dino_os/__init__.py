@@ -5,7 +5,9 @@ Dino Dynasty OS - A standalone AI operating system.
 __version__ = "0.2.0"
 
 from .agent_core import Agent, Tool
-from .memory_layer import MemoryLayer
+from .memory_layer import MemoryEntry, MemoryLayer
+from .async_memory import AsyncMemoryLayer
+from .sharded_memory import ShardedMemoryLayer
 from .scheduler import Scheduler
 from .tool_sandbox import ToolSandbox, ToolResult, FileSandbox
 from .message_bus import MessageBus, Message, MessagePriority
@@ -0,0 +1,206 @@
+"""Async Memory Layer - Non-blocking MemoryLayer access for Dino Dynasty OS agents."""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from .memory_layer import MemoryEntry, MemoryItem, MemoryLayer
+
+
+class AsyncMemoryLayer:
+    """Awaitable facade over MemoryLayer that keeps SQLite off the event loop.
+    
+    All writes go through one dedicated writer thread, so they reach SQLite
+    in the order they were issued. Reads run on a small pool of reader
+    threads (WAL lets them proceed alongside the writer). A read of a key
+    first waits for any write to that key still queued, and queries that
+    span keys wait for the latest write, so callers always read their own
+    writes.
+    
+    Write methods queue the write as soon as they are called and return
+    an awaitable future, so writes are ordered by call, not by when the
+    caller gets around to awaiting them.
+    """
+
+    def __init__(self, memory: Optional[MemoryLayer] = None, readers: int = 4,
+                 **memory_kwargs: Any):
+        """Initialize the async memory layer.
+        
+        Args:
+            memory: MemoryLayer to wrap (created from memory_kwargs if omitted)
+            readers: Size of the reader thread pool
+            **memory_kwargs: Passed to MemoryLayer() when memory is omitted
+        """
+        self.memory = memory if memory is not None else MemoryLayer(**memory_kwargs)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-writer")
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="memory-reader")
+        self._pending: Dict[str, asyncio.Future] = {}  # key -> latest queued write
+        self._last_write: Optional[asyncio.Future] = None
+        self._last_barrier: Optional[asyncio.Future] = None  # latest whole-store write
+
+    # === Writes ===
+
+    def add(self, key: str, value: str, metadata: Optional[Dict[str, Any]] = None,
+            embedding: Optional[Sequence[float]] = None,
+            ttl: Optional[float] = None) -> "asyncio.Future[bool]":
+        """Add or update a memory entry (see MemoryLayer.add)."""
+        return self._write(
+            self.memory.add, key, value, metadata, embedding=embedding, ttl=ttl, keys=[key]
+        )
+
+    def add_many(self, items: Iterable[MemoryItem],
+                 chunk_size: int = 1000) -> "asyncio.Future[int]":
+        """Add or update many entries in one transaction (see MemoryLayer.add_many)."""
+        items = list(items)
+        keys = [item["key"] if isinstance(item, dict) else item[0] for item in items]
+        return self._write(self.memory.add_many, items, chunk_size, keys=keys)
+
+    def set_embedding(self, key: str, embedding: Sequence[float]) -> "asyncio.Future[bool]":
+        """Attach an embedding to an existing memory (see MemoryLayer.set_embedding)."""
+        return self._write(self.memory.set_embedding, key, embedding, keys=[key])
+
+    def delete(self, key: str) -> "asyncio.Future[bool]":
+        """Delete a memory entry."""
+        return self._write(self.memory.delete, key, keys=[key])
+
+    def clear(self) -> "asyncio.Future[None]":
+        """Clear all memories."""
+        return self._write(self.memory.clear)
+
+    def sweep(self, batch_size: Optional[int] = None) -> "asyncio.Future[Dict[str, int]]":
+        """Run one expiry/eviction step (see MemoryLayer.sweep)."""
+        return self._write(self.memory.sweep, batch_size)
+
+    # === Reads ===
+
+    async def get(self, key: str) -> Optional[MemoryEntry]:
+        """Get a memory entry."""
+        return await self._read(self.memory.get, key, keys=[key])
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, MemoryEntry]:
+        """Get several memory entries (see MemoryLayer.get_many)."""
+        keys = list(keys)
+        return await self._read(self.memory.get_many, keys, keys=keys)
+
+    async def list_keys(self, prefix: Optional[str] = None, limit: int = 100) -> List[str]:
+        """List memory keys, optionally with prefix filter."""
+        return await self._read(self.memory.list_keys, prefix, limit)
+
+    async def scan(self, prefix: Optional[str] = None, with_values: bool = True,
+                   limit: Optional[int] = None) -> Union[List[MemoryEntry], List[str]]:
+        """List memories under a key prefix (see MemoryLayer.scan)."""
+        return await self._read(self.memory.scan, prefix, with_values, limit)
+
+    async def search(self, query: str, limit: int = 10) -> List[MemoryEntry]:
+        """Full-text search in memory values."""
+        return await self._read(self.memory.search, query, limit)
+
+    async def semantic_search(self, query_vector: Sequence[float], k: int = 10,
+                              exact: bool = False) -> List[MemoryEntry]:
+        """Nearest-neighbour search over embeddings."""
+        return await self._read(self.memory.semantic_search, query_vector, k, exact)
+
+    async def query(self, where: Optional[Dict[str, Any]] = None, prefix: Optional[str] = None,
+                    since: Optional[Union[datetime, str]] = None,
+                    until: Optional[Union[datetime, str]] = None,
+                    order_by: str = "-updated_at",
+                    limit: Optional[int] = 100) -> List[MemoryEntry]:
+        """Filter memories by metadata fields (see MemoryLayer.query)."""
+        return await self._read(self.memory.query, where, prefix, since, until, order_by, limit)
+
+    async def get_recent(self, limit: int = 10) -> List[MemoryEntry]:
+        """Get most recently updated memories."""
+        return await self._read(self.memory.get_recent, limit)
+
+    async def count(self) -> int:
+        """Get total number of memory entries."""
+        return await self._read(self.memory.count)
+
+    async def export(self) -> List[MemoryEntry]:
+        """Export all memories."""
+        return await self._read(self.memory.export)
+
+    async def changes(self, after: int = 0, prefix: Optional[str] = None,
+                      limit: int = 1000) -> List[Dict[str, Any]]:
+        """Read committed changes after a cursor (see MemoryLayer.changes)."""
+        return await self._read(self.memory.changes, after, prefix, limit)
+
+    def watch(self, prefix: Optional[str] = None, after: Optional[int] = None,
+              with_entries: bool = False,
+              poll_interval: float = 1.0) -> AsyncIterator[Dict[str, Any]]:
+        """Stream changes as they are committed (see MemoryLayer.watch)."""
+        return self.memory.watch(prefix, after, with_entries, poll_interval)
+
+    # === Lifecycle ===
+
+    async def flush(self) -> None:
+        """Wait until every queued write has been applied."""
+        if self._last_write is not None:
+            await asyncio.shield(self._last_write)
+
+    async def close(self) -> None:
+        """Apply queued writes, stop the worker threads and close the store."""
+        await self.flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._shutdown)
+
+    def _shutdown(self) -> None:
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        self.memory.close()
+
+    async def __aenter__(self) -> "AsyncMemoryLayer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    # === Internals ===
+
+    def _write(self, func: Callable, *args: Any, keys: Optional[List[str]] = None,
+               **kwargs: Any) -> asyncio.Future:
+        """Queue a write on the writer thread and record it as pending.
+        
+        Args:
+            func: MemoryLayer method
+            keys: Keys the write touches (None = the whole store)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._writer, functools.partial(func, *args, **kwargs))
+        self._last_write = future
+        if keys is None:
+            self._last_barrier = future
+        for key in keys or ():
+            self._pending[key] = future
+        future.add_done_callback(functools.partial(self._write_done, keys or ()))
+        return future
+
+    def _write_done(self, keys: Iterable[str], future: asyncio.Future) -> None:
+        for key in keys:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        if self._last_write is future:
+            self._last_write = None
+        if self._last_barrier is future:
+            self._last_barrier = None
+
+    async def _read(self, func: Callable, *args: Any, keys: Optional[List[str]] = None) -> Any:
+        """Run a read on the reader pool after the writes it depends on.
+        
+        Args:
+            func: MemoryLayer method
+            keys: Keys the read touches (None = any key, so wait for the
+                latest write)
+        """
+        if keys is None:
+            candidates = [self._last_write]
+        else:
+            candidates = [self._last_barrier] + [self._pending.get(key) for key in keys]
+        waits = list({id(f): f for f in candidates if f is not None}.values())
+        if waits:
+            # A failed write is reported to its own caller, not to readers
+            await asyncio.gather(*(asyncio.shield(f) for f in waits), return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, functools.partial(func, *args))
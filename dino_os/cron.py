@@ -0,0 +1,215 @@
+"""Cron - Cron expression parsing and next-fire-time calculation for Dino Dynasty OS."""
+
+import calendar
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional
+
+MONTH_NAMES = {
+    name: number for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun",
+         "jul", "aug", "sep", "oct", "nov", "dec"), start=1)
+}
+DAY_NAMES = {
+    name: number for number, name in enumerate(
+        ("sun", "mon", "tue", "wed", "thu", "fri", "sat"))
+}
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# (name, lowest, highest, names) for the five fields, in order
+FIELDS = (
+    ("minute", 0, 59, None),
+    ("hour", 0, 23, None),
+    ("day", 1, 31, None),
+    ("month", 1, 12, MONTH_NAMES),
+    ("day_of_week", 0, 7, DAY_NAMES),  # 0 and 7 are both Sunday
+)
+
+# Longest gap between fire times of a satisfiable expression is 8 years
+# (29 February across a skipped leap year); give up well past that.
+SEARCH_YEARS = 30
+
+# Days in each month of a leap year, for rejecting expressions that never fire
+_MAX_MONTH_DAYS = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+class CronExpression:
+    """A five-field cron expression compiled to bitsets.
+    
+    Each field becomes an int whose bit n is set when value n matches, so
+    the next fire time is found by bit scans over months, days, hours and
+    minutes rather than by stepping minute by minute.
+    
+    Fields are ``minute hour day month day_of_week`` and accept ``*``,
+    numbers, ranges (``1-5``), steps (``*/15``, ``0-30/10``, ``5/20``),
+    comma-separated lists, and month/day names (``jan``, ``mon-fri``).
+    The ``@hourly``/``@daily``/``@weekly``/``@monthly``/``@yearly`` macros
+    are also accepted. As in Vixie cron, when both day fields are
+    restricted a day matches if *either* does; when one starts with ``*``
+    only the other applies.
+    """
+
+    __slots__ = ("expr", "minutes", "hours", "days", "months", "weekdays",
+                 "day_star", "weekday_star", "_weekday_masks")
+
+    def __init__(self, expr: str):
+        """Parse and compile an expression.
+        
+        Args:
+            expr: Cron expression (min hour day month dow) or macro
+        
+        Raises:
+            ValueError: If the expression is malformed or can never fire.
+        """
+        self.expr = expr
+        text = MACROS.get(expr.strip().lower(), expr)
+        parts = text.split()
+        if len(parts) != len(FIELDS):
+            raise ValueError(f"Cron expression needs 5 fields, got {len(parts)}: {expr!r}")
+
+        masks = [_parse_field(part, *field[1:]) for part, field in zip(parts, FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = masks
+        if weekdays & (1 << 7):
+            weekdays = (weekdays | 1) & ~(1 << 7)
+        self.weekdays = weekdays
+        self.day_star = parts[2].startswith("*")
+        self.weekday_star = parts[4].startswith("*")
+
+        # Day-of-month bits matched by the weekday field, for each weekday
+        # the month can start on (0 = Sunday)
+        self._weekday_masks = tuple(
+            sum(1 << day for day in range(1, 32) if weekdays >> ((first + day - 1) % 7) & 1)
+            for first in range(7)
+        )
+
+        if self.weekday_star:
+            # Only the day-of-month field can rule every day out
+            if not any(self.months >> month & 1 and self.days & ((1 << (_MAX_MONTH_DAYS[month] + 1)) - 2)
+                       for month in range(1, 13)):
+                raise ValueError(f"Cron expression never fires: {expr!r}")
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expr!r})"
+
+    def matches(self, when: datetime) -> bool:
+        """Check whether a time (to the minute) is a fire time."""
+        if not (self.minutes >> when.minute & 1 and self.hours >> when.hour & 1
+                and self.months >> when.month & 1):
+            return False
+        return bool(self._day_mask(when.year, when.month) >> when.day & 1)
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """Find the first fire time strictly after a given time.
+        
+        Args:
+            after: Reference time (naive, same clock as the schedule)
+        
+        Returns:
+            Next fire time (seconds and microseconds zeroed), or None if
+            there is none within SEARCH_YEARS.
+        """
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        year, month, day, hour, minute = start.year, start.month, start.day, start.hour, start.minute
+        last_year = year + SEARCH_YEARS
+
+        while year <= last_year:
+            found = _next_bit(self.months, month)
+            if found is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if found != month:
+                month, day, hour, minute = found, 1, 0, 0
+
+            found = _next_bit(self._day_mask(year, month), day)
+            if found is None:
+                month, day, hour, minute = month + 1, 1, 0, 0
+                continue
+            if found != day:
+                day, hour, minute = found, 0, 0
+
+            found = _next_bit(self.hours, hour)
+            if found is None:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if found != hour:
+                hour, minute = found, 0
+
+            found = _next_bit(self.minutes, minute)
+            if found is None:
+                hour, minute = hour + 1, 0
+                continue
+            return datetime(year, month, day, hour, found)
+        return None
+
+    def _day_mask(self, year: int, month: int) -> int:
+        """Bits of the days of a month that match both day fields."""
+        first_weekday, month_days = calendar.monthrange(year, month)
+        weekday_mask = self._weekday_masks[(first_weekday + 1) % 7]  # Monday=0 -> Sunday=0
+        if self.day_star or self.weekday_star:
+            mask = self.days & weekday_mask
+        else:
+            mask = self.days | weekday_mask
+        return mask & ((1 << (month_days + 1)) - 2)
+
+
+@lru_cache(maxsize=1024)
+def parse(expr: str) -> CronExpression:
+    """Parse a cron expression, reusing the compiled form of repeated ones."""
+    return CronExpression(expr)
+
+
+def _next_bit(mask: int, start: int) -> Optional[int]:
+    """Lowest set bit of mask at position >= start."""
+    if start < 0:
+        start = 0
+    rest = mask >> start
+    if not rest:
+        return None
+    return start + (rest & -rest).bit_length() - 1
+
+
+def _parse_field(text: str, lowest: int, highest: int,
+                 names: Optional[Dict[str, int]]) -> int:
+    """Compile one field into a bitset of matching values."""
+    mask = 0
+    for item in text.split(","):
+        if not item:
+            raise ValueError(f"Empty list item in cron field {text!r}")
+        base, _, step_text = item.partition("/")
+        step = 1
+        if step_text:
+            step = _parse_number(step_text, None)
+            if step < 1:
+                raise ValueError(f"Cron step must be positive: {item!r}")
+
+        if base == "*":
+            start, end = lowest, highest
+        else:
+            first, dash, last = base.partition("-")
+            start = _parse_number(first, names)
+            end = _parse_number(last, names) if dash else (highest if step_text else start)
+        if not lowest <= start <= highest or not lowest <= end <= highest:
+            raise ValueError(f"Cron value out of range {lowest}-{highest}: {item!r}")
+        if start > end:
+            raise ValueError(f"Cron range is backwards: {item!r}")
+
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+    return mask
+
+
+def _parse_number(text: str, names: Optional[Dict[str, int]]) -> int:
+    if text.isdigit():
+        return int(text)
+    if names is not None and text.lower() in names:
+        return names[text.lower()]
+    raise ValueError(f"Invalid cron value: {text!r}")
@@ -0,0 +1,185 @@
+"""Job Store - Persistent storage for Scheduler jobs in Dino Dynasty OS."""
+
+import importlib
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+def callable_ref(func: Callable) -> str:
+    """Textual reference ("module:qualname") that resolve_callable can import.
+    
+    Raises:
+        ValueError: If func cannot be found again by import (lambdas,
+            closures, bound methods of instances, ...).
+    """
+    module = getattr(func, "__module__", None)
+    qualname = getattr(func, "__qualname__", None)
+    if not module or not qualname or "<" in qualname:
+        raise ValueError(f"Cannot persist job function {func!r}: not importable by name")
+    ref = f"{module}:{qualname}"
+    try:
+        found = resolve_callable(ref)
+    except (ImportError, AttributeError):
+        found = None
+    if found is not func:
+        raise ValueError(f"Cannot persist job function {func!r}: {ref} resolves elsewhere")
+    return ref
+
+
+def resolve_callable(ref: str) -> Callable:
+    """Import the callable named by a callable_ref string."""
+    module_name, _, qualname = ref.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+class JobStore(ABC):
+    """Where a Scheduler keeps job specs and run state across restarts.
+    
+    Rows are plain dicts with the keys id, schedule_type, schedule, func
+    (a callable_ref), args, kwargs, options, enabled, next_run, last_run
+    and failures; times are datetimes (naive UTC) or None.
+    """
+
+    @abstractmethod
+    def load(self) -> List[Dict[str, Any]]:
+        """Return every stored job."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, job: Dict[str, Any]) -> None:
+        """Insert or replace a job's spec and state."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove(self, job_id: str) -> None:
+        """Delete a job."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_state(self, states: Iterable[Dict[str, Any]]) -> None:
+        """Write next_run/last_run/failures for several jobs at once.
+        
+        Args:
+            states: Dicts with id, next_run, last_run and failures
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class SQLiteJobStore(JobStore):
+    """Job store in a single SQLite table.
+    
+    One connection is shared under a lock, since state flushes run on a
+    worker thread while specs are written from the caller's thread.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """Initialize the job store.
+        
+        Args:
+            db_path: Path to SQLite database file.
+        """
+        if db_path is None:
+            db_path = str(Path(__file__).parent.parent / "dino_scheduler.db")
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scheduler_jobs (
+                id TEXT PRIMARY KEY,
+                schedule_type TEXT NOT NULL,
+                schedule TEXT NOT NULL,
+                func TEXT NOT NULL,
+                args TEXT NOT NULL,
+                kwargs TEXT NOT NULL,
+                options TEXT NOT NULL,
+                enabled INTEGER NOT NULL,
+                next_run TEXT,
+                last_run TEXT,
+                failures INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+    def load(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM scheduler_jobs ORDER BY id").fetchall()
+        return [
+            {
+                "id": row["id"],
+                "schedule_type": row["schedule_type"],
+                "schedule": row["schedule"],
+                "func": row["func"],
+                "args": json.loads(row["args"]),
+                "kwargs": json.loads(row["kwargs"]),
+                "options": json.loads(row["options"]),
+                "enabled": bool(row["enabled"]),
+                "next_run": _parse_time(row["next_run"]),
+                "last_run": _parse_time(row["last_run"]),
+                "failures": row["failures"],
+            }
+            for row in rows
+        ]
+
+    def save(self, job: Dict[str, Any]) -> None:
+        try:
+            args, kwargs = json.dumps(list(job["args"])), json.dumps(job["kwargs"])
+        except TypeError as e:
+            raise ValueError(f"Cannot persist job {job['id']}: arguments must be JSON-serializable ({e})")
+        params = (
+            job["id"], job["schedule_type"], job["schedule"], job["func"], args, kwargs,
+            json.dumps(job["options"]), int(job["enabled"]),
+            _format_time(job["next_run"]), _format_time(job["last_run"]), job["failures"],
+        )
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO scheduler_jobs VALUES (?,?,?,?,?,?,?,?,?,?,?)", params)
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM scheduler_jobs WHERE id = ?", (job_id,))
+
+    def update_state(self, states: Iterable[Dict[str, Any]]) -> None:
+        params = [
+            (_format_time(state["next_run"]), _format_time(state["last_run"]),
+             state["failures"], state["id"])
+            for state in states
+        ]
+        if not params:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE scheduler_jobs SET next_run = ?, last_run = ?, failures = ? WHERE id = ?",
+                    params,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
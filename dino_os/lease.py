@@ -0,0 +1,114 @@
+"""Lease - Leader election between local processes for Dino Dynasty OS."""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+
+class SQLiteLease:
+    """A named, time-limited lock shared by processes through SQLite.
+    
+    At most one owner holds the lease at a time. The holder must renew it
+    before ``ttl`` seconds pass; if it stops (crash, hang, shutdown) the
+    lease expires and the next acquire() from another process takes it
+    over. Every change of owner increments ``token``, a fencing token
+    that work started under the lease can carry.
+    
+    Expiry uses the wall clock, so all contenders must share a host (or
+    well-synchronised clocks).
+    """
+
+    def __init__(self, name: str = "scheduler", db_path: Optional[str] = None,
+                 ttl: float = 5.0, owner: Optional[str] = None):
+        """Initialize the lease.
+        
+        Args:
+            name: Lease name; contenders for the same role use the same name
+            db_path: Path to SQLite database file.
+            ttl: Seconds the lease stays valid after each renewal
+            owner: Identity of this contender (default: host:pid:random)
+        """
+        if db_path is None:
+            db_path = str(Path(__file__).parent.parent / "dino_scheduler.db")
+        self.name = name
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.token = 0
+        self._expires_at = 0.0  # local view of our lease's expiry
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scheduler_leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                token INTEGER NOT NULL
+            )
+        """)
+
+    @property
+    def held(self) -> bool:
+        """Whether this process holds the lease right now."""
+        return time.time() < self._expires_at
+
+    def acquire(self) -> bool:
+        """Take the lease if it is free or expired, or renew it if ours.
+        
+        Returns:
+            True if this process holds the lease afterwards.
+        """
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            # One statement, so the check and the takeover are atomic
+            self._conn.execute(
+                """
+                INSERT INTO scheduler_leases (name, owner, expires_at, token) VALUES (?, ?, ?, 1)
+                ON CONFLICT(name) DO UPDATE SET
+                    owner = excluded.owner,
+                    expires_at = excluded.expires_at,
+                    token = token + (owner != excluded.owner)
+                WHERE owner = excluded.owner OR expires_at < ?
+                """,
+                (self.name, self.owner, expires_at, now),
+            )
+            row = self._conn.execute(
+                "SELECT owner, expires_at, token FROM scheduler_leases WHERE name = ?", (self.name,)
+            ).fetchone()
+        if row is not None and row[0] == self.owner:
+            self.token = row[2]
+            # Count from before the write, so we never outlive the stored expiry
+            self._expires_at = expires_at
+            return True
+        self._expires_at = 0.0
+        return False
+
+    def release(self) -> None:
+        """Give up the lease (if held) so another process can take it at once."""
+        self._expires_at = 0.0
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scheduler_leases SET expires_at = 0 WHERE name = ? AND owner = ?",
+                (self.name, self.owner),
+            )
+
+    def holder(self) -> Optional[str]:
+        """Owner of the lease if it is currently held by anyone."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT owner, expires_at FROM scheduler_leases WHERE name = ?", (self.name,)
+            ).fetchone()
+        return row[0] if row is not None and row[1] > time.time() else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,106 +1,1192 @@
 """Memory Layer - Simplified SQLite-backed persistent memory for Dino Dynasty OS."""
 
+import asyncio
+import atexit
+import gzip
+import hashlib
 import json
+import re
 import sqlite3
-from datetime import datetime
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .message_bus import MessageBus
+from .vector_index import VectorIndex, build_index, encode_vector
+
+
+# Splits a search query into "quoted phrases" and bare terms (optionally prefix*)
+_FTS_TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+# Metadata field names usable in query() / index_metadata(); dots address
+# nested objects (e.g. "result.exit_code")
+_METADATA_FIELD_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+# add_many() accepts (key, value), (key, value, metadata) or export()-style dicts
+# (which may also carry an "embedding" and "ttl" or "expires_at")
+MemoryItem = Union[Tuple[str, str], Tuple[str, str, Optional[Dict[str, Any]]], Dict[str, Any]]
+
+# (key, value, metadata_json, created_at, updated_at, expires_at) as written by add()
+_UpsertParams = Tuple[str, str, Optional[str], str, str, Optional[str]]
+# The same plus value_hash, for UPSERT_SQL (value is "" when stored as a blob)
+_StoredParams = Tuple[str, str, Optional[str], str, str, Optional[str], Optional[str]]
+
+
+def _value_sql(table: str) -> str:
+    """SQL expression for a memory's value, decoding it if stored as a blob.
+    
+    Args:
+        table: Table name, alias or trigger row ("new"/"old") of memories
+    """
+    return (
+        f"CASE WHEN {table}.value_hash IS NULL THEN {table}.value ELSE ("
+        f"SELECT memory_blob_text(b.hash, b.codec, b.dict_id, b.data) "
+        f"FROM memory_blobs b WHERE b.hash = {table}.value_hash) END"
+    )
+
+
+def _open_ndjson(path: str, mode: str, compression: Optional[str] = None) -> IO[str]:
+    """Open an NDJSON file for text I/O, optionally gzip/zstd compressed.
+    
+    Args:
+        path: File path
+        mode: "r" or "w"
+        compression: "gzip", "zstd" or None to infer from the file suffix
+        
+    Returns:
+        Text file object.
+    """
+    if compression is None:
+        suffix = Path(path).suffix.lower()
+        compression = {".gz": "gzip", ".zst": "zstd", ".zstd": "zstd"}.get(suffix)
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd compression requires zstandard (pip install zstandard)")
+        return zstandard.open(path, mode + "t", encoding="utf-8")
+    if compression is not None:
+        raise ValueError(f"Unknown compression: {compression}")
+    return open(path, mode, encoding="utf-8")
+
+
+def _expires_at(now: datetime, ttl: Optional[float]) -> Optional[str]:
+    """Absolute expiry timestamp for a TTL in seconds (None = never)."""
+    return (now + timedelta(seconds=ttl)).isoformat() if ttl is not None else None
+
+
+def _flush_at_exit(ref: "weakref.ReferenceType[MemoryLayer]") -> None:
+    """atexit hook: flush a write-behind MemoryLayer if it is still alive."""
+    memory = ref()
+    if memory is not None:
+        try:
+            memory.flush()
+        except sqlite3.Error as e:
+            print(f"Memory flush error: {e}")
+
+
+class MemoryEntry:
+    """One memory returned by MemoryLayer reads.
+    
+    A slotted object rather than a dict, so large result sets stay
+    compact, and metadata is only parsed from JSON when first accessed.
+    Dict-style access (``entry["value"]``, ``entry.get("score")``,
+    ``dict(entry)``) keeps working for existing callers.
+    """
+    
+    __slots__ = ("key", "value", "created_at", "updated_at", "score",
+                 "_metadata", "_metadata_json")
+    
+    # Field names in dict form ("score" only when set)
+    FIELDS = ("key", "value", "metadata", "created_at", "updated_at")
+    
+    def __init__(self, key: str, value: str, metadata_json: Optional[str],
+                 created_at: str, updated_at: str):
+        self.key = key
+        self.value = value
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.score: Optional[float] = None
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._metadata_json = metadata_json
+    
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "MemoryEntry":
+        """Build an entry from a row selected with MemoryLayer.ENTRY_COLUMNS."""
+        return cls(row["key"], row["value"], row["metadata"], row["created_at"], row["updated_at"])
+    
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        """Metadata dict, decoded on first access."""
+        if self._metadata_json is not None:
+            self._metadata = json.loads(self._metadata_json) if self._metadata_json else None
+            self._metadata_json = None
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, value: Optional[Dict[str, Any]]) -> None:
+        self._metadata = value
+        self._metadata_json = None
+    
+    def keys(self) -> List[str]:
+        return list(self.FIELDS) + (["score"] if self.score is not None else [])
+    
+    def __getitem__(self, name: str) -> Any:
+        if name in self.FIELDS or (name == "score" and self.score is not None):
+            return getattr(self, name)
+        raise KeyError(name)
+    
+    def __setitem__(self, name: str, value: Any) -> None:
+        if name not in self.FIELDS and name != "score":
+            raise KeyError(name)
+        setattr(self, name, value)
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self.keys()
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def __len__(self) -> int:
+        return len(self.keys())
+    
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(name, self[name]) for name in self.keys()]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy (the shape MemoryLayer returned before MemoryEntry)."""
+        return dict(self.items())
+    
+    def to_json(self) -> str:
+        """Serialize as a JSON object without parsing and re-encoding metadata."""
+        fields = {"key": self.key, "value": self.value,
+                  "created_at": self.created_at, "updated_at": self.updated_at}
+        if self.score is not None:
+            fields["score"] = self.score
+        if self._metadata_json is not None:
+            metadata = self._metadata_json or "null"
+        else:
+            metadata = json.dumps(self._metadata, ensure_ascii=False)
+        return json.dumps(fields, ensure_ascii=False)[:-1] + f', "metadata": {metadata}}}'
+    
+    def copy(self) -> "MemoryEntry":
+        """Shallow copy (metadata dict is shared once decoded)."""
+        entry = MemoryEntry(self.key, self.value, self._metadata_json,
+                            self.created_at, self.updated_at)
+        entry._metadata = self._metadata
+        entry.score = self.score
+        return entry
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (MemoryEntry, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"MemoryEntry({self.to_dict()!r})"
+
+
+class MemoryCache:
+    """Thread-safe LRU cache of get() results with optional TTL.
+    
+    Misses are cached too (as None). Every invalidation bumps a
+    generation counter so a read that raced with a write can't put a
+    stale row back into the cache.
+    """
+    
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        """Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of cached keys
+            ttl: Seconds an entry stays valid (None = until evicted)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self._entries: "OrderedDict[str, Tuple[float, Optional[MemoryEntry]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Tuple[bool, Optional[MemoryEntry]]:
+        """Look up a key.
+        
+        Returns:
+            (found, entry) - entry may be None for a cached miss.
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                expires_at, entry = cached
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, entry: Optional[MemoryEntry], generation: int) -> None:
+        """Cache a row read while the cache was at ``generation``."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (expires_at, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys: Optional[Iterable[str]] = None) -> None:
+        """Drop the given keys, or everything when keys is None."""
+        with self._lock:
+            self.generation += 1
+            if keys is None:
+                self._entries.clear()
+            else:
+                for key in keys:
+                    self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for sizing the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
 
 
 class MemoryLayer:
-    """Simplified SQLite-based memory layer (key-value with metadata)."""
+    """Simplified SQLite-based memory layer (key-value with metadata).
+    
+    Each thread gets one long-lived connection opened in WAL mode, so
+    readers never block the writer and no call pays for a reconnect.
+    """
     
-    def __init__(self, db_path: Optional[str] = None):
+    # Pragmas applied to every pooled connection
+    PRAGMAS = {
+        # Must precede journal_mode, which initialises a new file; lets
+        # sweep() hand freed pages back (no effect on existing databases)
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -16000,  # negative = KiB, i.e. ~16 MB
+        "busy_timeout": 5000,
+    }
+    
+    # Size of sqlite3's per-connection prepared statement cache
+    STATEMENT_CACHE_SIZE = 128
+
+    # Single-statement write: updates in place on key conflict so the row id,
+    # both indexes and the original created_at are left untouched
+    UPSERT_SQL = """
+        INSERT INTO memories (key, value, metadata, created_at, updated_at, expires_at, value_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            value = excluded.value,
+            value_hash = excluded.value_hash,
+            metadata = excluded.metadata,
+            updated_at = excluded.updated_at,
+            expires_at = excluded.expires_at
+    """
+
+    # Full memory row for MemoryEntry.from_row(); blob-stored values are decoded
+    ENTRY_COLUMNS = f"key, {_value_sql('memories')} AS value, metadata, created_at, updated_at"
+
+    # Values this many UTF-8 bytes or longer are stored once per distinct
+    # content in memory_blobs, compressed; shorter ones stay inline
+    BLOB_THRESHOLD = 1024
+    # zlib level for blobs (used unless a zstd dictionary has been trained)
+    BLOB_COMPRESSION_LEVEL = 6
+    # Decoded blobs kept in memory, shared by all connections
+    BLOB_CACHE_SIZE = 256
+
+    # Attaches an embedding to the memory stored under a key
+    EMBEDDING_UPSERT_SQL = """
+        INSERT OR REPLACE INTO memory_embeddings (memory_id, dim, vector)
+        SELECT id, ?, ? FROM memories WHERE key = ?
+    """
+
+    # Seconds between PRAGMA data_version checks by the read cache; writes
+    # from other processes may be served stale for at most this long
+    # (in-process writes always invalidate immediately). 0 = every get().
+    CACHE_RECHECK_INTERVAL = 0.05
+
+    # Keys per "WHERE key IN (...)" query, under SQLite's bound-parameter limit
+    GET_MANY_CHUNK_SIZE = 500
+
+    # semantic_search() switches from exact to IVF search at this many vectors
+    IVF_THRESHOLD = 20000
+    # Clusters scanned per IVF query; raise for recall, lower for speed
+    IVF_NPROBE = 8
+
+    # Rows deleted per sweep() step, keeping each write transaction short
+    SWEEP_BATCH_SIZE = 500
+    # Free pages returned to the filesystem per sweep() step
+    VACUUM_PAGES_PER_SWEEP = 256
+    # Eviction policy -> column evicted in ascending order
+    EVICTION_ORDER = {"lru": "updated_at", "oldest": "created_at"}
+    # Most recent changes kept in the change feed; sweep() prunes older ones
+    CHANGE_LOG_SIZE = 100000
+    # Changes fetched per watch() poll
+    WATCH_BATCH_SIZE = 500
+
+    # query() comparison operators, e.g. where={"exit_code": {"!=": 0}}
+    QUERY_OPERATORS = ("=", "!=", "<", "<=", ">", ">=")
+    # Columns query() can order by; anything else is a metadata field
+    QUERY_ORDER_COLUMNS = ("key", "created_at", "updated_at")
+
+    def __init__(self, db_path: Optional[str] = None, cache_size: int = 0,
+                 cache_ttl: Optional[float] = None, write_behind: bool = False,
+                 flush_size: int = 1000, flush_interval: float = 1.0,
+                 indexed_fields: Sequence[str] = ()):
         """Initialize the memory layer.
         
         Args:
             db_path: Path to SQLite database file.
+            cache_size: Keys kept in the read-through get() cache (0 = off)
+            cache_ttl: Seconds a cached entry stays valid (None = no expiry)
+            write_behind: Buffer add() calls in memory and write them in
+                group commits (trades durability of the last
+                flush_interval seconds for write throughput)
+            flush_size: Buffered keys that trigger an immediate flush
+            flush_interval: Max seconds a buffered write waits to be flushed
+            indexed_fields: Hot metadata fields to index for query()
+                (see index_metadata())
         """
         if db_path is None:
             db_path = str(Path(__file__).parent.parent / "dino_memory.db")
         self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.cache = MemoryCache(cache_size, cache_ttl) if cache_size > 0 else None
+        # Cached indexes keyed by dimension (negated for exact-only indexes),
+        # each with the embedding_version it was built at
+        self._vector_indexes: Dict[int, Tuple[int, VectorIndex]] = {}
+        self._vector_lock = threading.Lock()
+        # Key prefix -> (max entries, eviction policy), enforced by sweep()
+        self.quotas: Dict[str, Tuple[int, str]] = {}
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+        # Write-behind state: key -> latest UPSERT_SQL params, coalesced
+        self.write_behind = write_behind
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._write_buffer: Dict[str, _UpsertParams] = {}
+        self._flushing: Dict[str, _UpsertParams] = {}  # being committed right now
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_stop = threading.Event()
+        # Blob state: decoded text by hash, zstd dictionaries by id
+        self._blob_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._blob_lock = threading.Lock()
+        self._zstd_dicts: Dict[int, Any] = {}
+        self.dictionary_id: Optional[int] = None
+        # watch() iterators to wake after a commit: (event loop, event)
+        self._watchers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self._watch_lock = threading.Lock()
         self._init_db()
+        for field in indexed_fields:
+            self.index_metadata(field)
+        if write_behind:
+            self._start_flusher()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new tuned connection and register it with the pool."""
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,  # autocommit; batches use explicit BEGIN
+            check_same_thread=False,
+            cached_statements=self.STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.create_function("memory_blob_text", 4, self._decode_blob)
+        for pragma, value in self.PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma}={value}")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Connection owned by the calling thread (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Flush buffered writes, stop background threads and close every
+        pooled connection.
+        
+        The layer stays usable; the next call simply reconnects.
+        """
+        self.stop_sweeper()
+        self._stop_flusher()
+        self.flush()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def __enter__(self) -> "MemoryLayer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def _init_db(self) -> None:
         """Initialize the SQLite database - simplified schema."""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        with sqlite3.connect(self.db_path) as conn:
-            # Simplified: single table with key-value + metadata
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS memories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    key TEXT UNIQUE NOT NULL,
-                    value TEXT NOT NULL,
-                    metadata TEXT,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-            """)
-            # Index for faster lookups
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_memories_key ON memories(key)
+        conn = self._conn
+        # Simplified: single table with key-value + metadata
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS memories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                value TEXT NOT NULL,
+                metadata TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                expires_at TEXT
+            )
+        """)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(memories)")}
+        if "expires_at" not in columns:
+            conn.execute("ALTER TABLE memories ADD COLUMN expires_at TEXT")
+        if "value_hash" not in columns:
+            conn.execute("ALTER TABLE memories ADD COLUMN value_hash TEXT")
+        # Index for faster lookups
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_memories_key ON memories(key)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_memories_updated ON memories(updated_at)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_memories_expires ON memories(expires_at)
+            WHERE expires_at IS NOT NULL
+        """)
+        self._init_blobs(conn)
+        self.fts_enabled = self._init_fts(conn)
+        self._init_embeddings(conn)
+        self._init_changes(conn)
+        row = conn.execute(
+            "SELECT value FROM memory_state WHERE name = 'zstd_dictionary'"
+        ).fetchone()
+        self.dictionary_id = row[0] if row else None
+
+    def _init_fts(self, conn: sqlite3.Connection) -> bool:
+        """Create the FTS5 index over memory values, kept in sync by triggers.
+        
+        Returns:
+            False if this SQLite build has no FTS5 (search() then uses LIKE).
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'"
+        ).fetchone()
+        if not exists:
+            try:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE memories_fts USING fts5(
+                        value, content='memories', content_rowid='id'
+                    )
+                """)
+            except sqlite3.OperationalError:
+                return False
+        # Triggers index the decoded text, so blob-stored values are searchable;
+        # databases from before blob storage get theirs replaced
+        trigger = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'memories_fts_au'"
+        ).fetchone()
+        if trigger is None or "value_hash" not in trigger[0]:
+            conn.executescript(f"""
+                DROP TRIGGER IF EXISTS memories_fts_ai;
+                DROP TRIGGER IF EXISTS memories_fts_ad;
+                DROP TRIGGER IF EXISTS memories_fts_au;
+                CREATE TRIGGER memories_fts_ai AFTER INSERT ON memories BEGIN
+                    INSERT INTO memories_fts(rowid, value) VALUES (new.id, {_value_sql('new')});
+                END;
+                CREATE TRIGGER memories_fts_ad AFTER DELETE ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, value)
+                    VALUES ('delete', old.id, {_value_sql('old')});
+                END;
+                CREATE TRIGGER memories_fts_au AFTER UPDATE OF value, value_hash ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, value)
+                    VALUES ('delete', old.id, {_value_sql('old')});
+                    INSERT INTO memories_fts(rowid, value) VALUES (new.id, {_value_sql('new')});
+                END;
             """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_memories_updated ON memories(updated_at)
+        if not exists:
+            # Index rows written before the FTS table existed ('rebuild' would
+            # read the raw column and miss blob-stored values)
+            conn.execute(
+                f"INSERT INTO memories_fts(rowid, value) SELECT id, {_value_sql('memories')} FROM memories"
+            )
+        return True
+
+    def _init_blobs(self, conn: sqlite3.Connection) -> None:
+        """Create the content-addressed blob store for large values.
+        
+        A memory whose value is stored as a blob keeps an empty ``value``
+        and points at its blob by ``value_hash`` (SHA-256 of the UTF-8
+        text). Identical values share one blob; blobs no longer referenced
+        are deleted by sweep().
+        """
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS memory_blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                dict_id INTEGER,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS memory_dictionaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                data BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_memories_value_hash ON memories(value_hash)
+            WHERE value_hash IS NOT NULL;
+        """)
+
+    def _init_changes(self, conn: sqlite3.Connection) -> None:
+        """Create the change feed read by changes() and watch().
+        
+        Triggers append one row per insert, update or delete of a memory,
+        whichever method made it, so ``seq`` (AUTOINCREMENT, never reused)
+        is a total order of committed changes that consumers can resume
+        from.
+        """
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS memory_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                op TEXT NOT NULL,
+                changed_at TEXT NOT NULL
+            );
+            CREATE TRIGGER IF NOT EXISTS memory_changes_ai AFTER INSERT ON memories BEGIN
+                INSERT INTO memory_changes (key, op, changed_at) VALUES (new.key, 'put', new.updated_at);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memory_changes_au AFTER UPDATE ON memories BEGIN
+                INSERT INTO memory_changes (key, op, changed_at) VALUES (new.key, 'put', new.updated_at);
+            END;
+            CREATE TRIGGER IF NOT EXISTS memory_changes_ad AFTER DELETE ON memories BEGIN
+                INSERT INTO memory_changes (key, op, changed_at)
+                VALUES (old.key, 'delete', strftime('%Y-%m-%dT%H:%M:%f', 'now'));
+            END;
+        """)
+
+    def _init_embeddings(self, conn: sqlite3.Connection) -> None:
+        """Create the embedding table and its version counter.
+        
+        Embeddings are float32 BLOBs keyed by memory row id. They are
+        dropped when their memory is deleted or its value changes, and
+        every embedding write bumps ``embedding_version`` so cached
+        vector indexes know when to reload.
+        """
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS memory_embeddings (
+                memory_id INTEGER PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_memory_embeddings_dim ON memory_embeddings(dim);
+            CREATE TABLE IF NOT EXISTS memory_state (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO memory_state (name, value) VALUES ('embedding_version', 0);
+            CREATE TRIGGER IF NOT EXISTS memory_embeddings_ad AFTER DELETE ON memories BEGIN
+                DELETE FROM memory_embeddings WHERE memory_id = old.id;
+            END;
+            CREATE TRIGGER IF NOT EXISTS memory_embeddings_version_ai AFTER INSERT ON memory_embeddings BEGIN
+                UPDATE memory_state SET value = value + 1 WHERE name = 'embedding_version';
+            END;
+            CREATE TRIGGER IF NOT EXISTS memory_embeddings_version_ad AFTER DELETE ON memory_embeddings BEGIN
+                UPDATE memory_state SET value = value + 1 WHERE name = 'embedding_version';
+            END;
+        """)
+        trigger = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'memory_embeddings_au'"
+        ).fetchone()
+        if trigger is None or "value_hash" not in trigger[0]:
+            conn.executescript("""
+                DROP TRIGGER IF EXISTS memory_embeddings_au;
+                CREATE TRIGGER memory_embeddings_au AFTER UPDATE OF value, value_hash ON memories
+                WHEN old.value IS NOT new.value OR old.value_hash IS NOT new.value_hash BEGIN
+                    DELETE FROM memory_embeddings WHERE memory_id = old.id;
+                END;
             """)
-            conn.commit()
 
-    def add(self, key: str, value: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+    def add(self, key: str, value: str, metadata: Optional[Dict[str, Any]] = None,
+            embedding: Optional[Sequence[float]] = None, ttl: Optional[float] = None) -> bool:
         """Add or update a memory entry.
         
         Args:
             key: Unique memory key
             value: Memory value
             metadata: Optional metadata dictionary
+            embedding: Optional embedding vector of the value, for
+                semantic_search()
+            ttl: Optional lifetime in seconds; the entry then reads as
+                missing and is deleted by the next sweep()
             
         Returns:
             True if successful.
         """
-        now = datetime.utcnow().isoformat()
+        now = datetime.utcnow()
         metadata_json = json.dumps(metadata) if metadata else None
+        params = (key, value, metadata_json, now.isoformat(), now.isoformat(),
+                  _expires_at(now, ttl))
         
-        # Check if key exists to preserve created_at
-        existing = self.get(key)
-        created_at = existing['created_at'] if existing else now
-        
+        if self.write_behind and embedding is None:
+            self._buffer_write(params)
+            return True
+        self._discard_buffered([key])
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    """INSERT OR REPLACE INTO memories 
-                       (key, value, metadata, created_at, updated_at) 
-                       VALUES (?, ?, ?, ?, ?)""",
-                    (key, value, metadata_json, created_at, now)
-                )
-                conn.commit()
+            if embedding is None and self._blob_bytes(value) is None:
+                self._conn.execute(self.UPSERT_SQL, params + (None,))
+            else:
+                # A new blob commits together with the row pointing at it
+                with self.batch():
+                    self._conn.execute(self.UPSERT_SQL, self._store_values([params])[0])
+                    if embedding is not None:
+                        self._conn.execute(
+                            self.EMBEDDING_UPSERT_SQL,
+                            (len(embedding), encode_vector(embedding), key)
+                        )
+            self._invalidate([key])
+            self._notify_watchers()
             return True
         except sqlite3.Error:
             return False
 
-    def get(self, key: str) -> Optional[Dict[str, Any]]:
+    def set_embedding(self, key: str, embedding: Sequence[float]) -> bool:
+        """Attach (or replace) the embedding of an existing memory.
+        
+        Args:
+            key: Memory key
+            embedding: Embedding vector
+            
+        Returns:
+            True if the memory exists and the embedding was stored.
+        """
+        self._flush_pending()
+        cursor = self._conn.execute(
+            self.EMBEDDING_UPSERT_SQL, (len(embedding), encode_vector(embedding), key)
+        )
+        return cursor.rowcount > 0
+
+    def add_many(self, items: Iterable[MemoryItem], chunk_size: int = 1000) -> int:
+        """Add or update many memory entries in one transaction.
+        
+        Args:
+            items: (key, value), (key, value, metadata) tuples or dicts
+                with key/value/metadata fields
+            chunk_size: Rows handed to each executemany call
+            
+        Returns:
+            Number of entries written.
+        """
+        written = 0
+        with self.batch():
+            chunk: List[_UpsertParams] = []
+            embeddings: List[Tuple[int, bytes, str]] = []
+            for item in items:
+                chunk.append(self._item_to_params(item))
+                embedding = item.get("embedding") if isinstance(item, dict) else None
+                if embedding is not None:
+                    embeddings.append((len(embedding), encode_vector(embedding), chunk[-1][0]))
+                if len(chunk) >= chunk_size:
+                    written += self._write_chunk(chunk, embeddings)
+                    chunk, embeddings = [], []
+            if chunk:
+                written += self._write_chunk(chunk, embeddings)
+        return written
+
+    def _write_chunk(self, chunk: List[_UpsertParams],
+                     embeddings: List[Tuple[int, bytes, str]]) -> int:
+        """Upsert one add_many() chunk, then the embeddings that came with it."""
+        self._discard_buffered(params[0] for params in chunk)
+        self._conn.executemany(self.UPSERT_SQL, self._store_values(chunk))
+        if embeddings:
+            self._conn.executemany(self.EMBEDDING_UPSERT_SQL, embeddings)
+        self._invalidate(params[0] for params in chunk)
+        return len(chunk)
+
+    def flush(self) -> int:
+        """Write all buffered (write-behind) entries in one transaction.
+        
+        Returns:
+            Number of entries written.
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                if not self._write_buffer:
+                    return 0
+                self._flushing, self._write_buffer = self._write_buffer, {}
+            try:
+                with self.batch():
+                    self._conn.executemany(
+                        self.UPSERT_SQL, self._store_values(list(self._flushing.values()))
+                    )
+            except BaseException:
+                with self._buffer_lock:
+                    # Keep unflushed writes unless a newer one replaced them
+                    self._write_buffer = {**self._flushing, **self._write_buffer}
+                    self._flushing = {}
+                raise
+            with self._buffer_lock:
+                flushed, self._flushing = self._flushing, {}
+            self._invalidate(flushed)
+            return len(flushed)
+
+    def _buffer_write(self, params: _UpsertParams) -> None:
+        """Queue an upsert; a later write to the same key replaces it."""
+        key = params[0]
+        with self._buffer_lock:
+            self._write_buffer.pop(key, None)
+            self._write_buffer[key] = params
+            full = len(self._write_buffer) >= self.flush_size
+        self._invalidate([key])
+        if full:
+            self.flush()
+
+    def _discard_buffered(self, keys: Iterable[str]) -> None:
+        """Drop buffered writes superseded by a direct write or delete."""
+        if self._write_buffer:
+            with self._buffer_lock:
+                for key in keys:
+                    self._write_buffer.pop(key, None)
+
+    def _flush_pending(self) -> None:
+        """Flush before a query that reads the table directly."""
+        if self._write_buffer:
+            self.flush()
+
+    def _buffered_entry(self, key: str) -> Tuple[bool, Optional[MemoryEntry]]:
+        """Look a key up in the write-behind buffer.
+        
+        Returns:
+            (found, entry) - entry is None if the buffered write has expired.
+        """
+        with self._buffer_lock:
+            params = self._write_buffer.get(key) or self._flushing.get(key)
+        if params is None:
+            return False, None
+        key, value, metadata_json, created_at, updated_at, expires_at = params
+        if expires_at is not None and expires_at <= datetime.utcnow().isoformat():
+            return True, None
+        # The upsert will keep an existing row's created_at
+        row = self._conn.execute(
+            "SELECT created_at FROM memories WHERE key = ?", (key,)
+        ).fetchone()
+        return True, MemoryEntry(key, value, metadata_json,
+                                 row["created_at"] if row else created_at, updated_at)
+
+    def _start_flusher(self) -> None:
+        """Flush the write-behind buffer every flush_interval seconds.
+        
+        Also registers an exit hook so buffered writes survive a normal
+        interpreter shutdown even if close() is never called.
+        """
+        self._flusher_stop.clear()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="memory-flusher", daemon=True
+        )
+        self._flusher.start()
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+    def _stop_flusher(self) -> None:
+        if self._flusher is None:
+            return
+        self._flusher_stop.set()
+        if self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self._flusher = None
+
+    def _flush_loop(self) -> None:
+        """Background flusher body."""
+        while not self._flusher_stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Memory flush error: {e}")
+
+    def _blob_bytes(self, value: str) -> Optional[bytes]:
+        """UTF-8 bytes of a value that belongs in the blob store, else None."""
+        if len(value) * 4 < self.BLOB_THRESHOLD:  # can't reach it even in 4-byte chars
+            return None
+        raw = value.encode("utf-8")
+        return raw if len(raw) >= self.BLOB_THRESHOLD else None
+
+    def _store_values(self, rows: List[_UpsertParams]) -> List[_StoredParams]:
+        """Move large values into memory_blobs and return UPSERT_SQL params.
+        
+        Only blobs not stored yet are compressed and inserted, so writing a
+        repeated value costs one hash and one index lookup. Must run in the
+        transaction that writes the rows, so sweep() can't collect a blob
+        between its insert and the row that references it.
+        """
+        stored: List[_StoredParams] = []
+        new_blobs: Dict[str, bytes] = {}
+        for params in rows:
+            raw = self._blob_bytes(params[1])
+            if raw is None:
+                stored.append(params + (None,))
+                continue
+            value_hash = hashlib.sha256(raw).hexdigest()
+            new_blobs[value_hash] = raw
+            stored.append((params[0], "") + params[2:] + (value_hash,))
+        if not new_blobs:
+            return stored
+        hashes = list(new_blobs)
+        for start in range(0, len(hashes), self.GET_MANY_CHUNK_SIZE):
+            chunk = hashes[start:start + self.GET_MANY_CHUNK_SIZE]
+            cursor = self._conn.execute(
+                f"SELECT hash FROM memory_blobs WHERE hash IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for (value_hash,) in cursor:
+                del new_blobs[value_hash]
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO memory_blobs (hash, codec, dict_id, size, data) VALUES (?, ?, ?, ?, ?)",
+            [(value_hash,) + self._compress(raw) for value_hash, raw in new_blobs.items()]
+        )
+        return stored
+
+    def _compress(self, raw: bytes) -> Tuple[str, Optional[int], int, bytes]:
+        """Compress a blob: (codec, dict_id, size, data)."""
+        dict_id = self.dictionary_id
+        if dict_id is not None and self._zstd_dictionary(dict_id) is not None:
+            compressors = getattr(self._local, "zstd_compressors", None)
+            if compressors is None:
+                compressors = self._local.zstd_compressors = {}
+            compressor = compressors.get(dict_id)
+            if compressor is None:
+                import zstandard
+                compressor = zstandard.ZstdCompressor(dict_data=self._zstd_dictionary(dict_id))
+                compressors[dict_id] = compressor
+            codec, data = "zstd", compressor.compress(raw)
+        else:
+            dict_id = None
+            codec, data = "zlib", zlib.compress(raw, self.BLOB_COMPRESSION_LEVEL)
+        if len(data) >= len(raw):
+            return "raw", None, len(raw), raw
+        return codec, dict_id, len(raw), data
+
+    def _decode_blob(self, value_hash: str, codec: str, dict_id: Optional[int],
+                     data: Optional[bytes]) -> Optional[str]:
+        """SQL function memory_blob_text(): a blob's text, cached by hash."""
+        if data is None:
+            return None
+        with self._blob_lock:
+            text = self._blob_cache.get(value_hash)
+            if text is not None:
+                self._blob_cache.move_to_end(value_hash)
+                return text
+        if codec == "zlib":
+            raw = zlib.decompress(data)
+        elif codec == "zstd":
+            dictionary = self._zstd_dictionary(dict_id)
+            if dictionary is None:
+                raise RuntimeError("zstd-compressed memory requires zstandard (pip install zstandard)")
+            import zstandard
+            raw = zstandard.ZstdDecompressor(dict_data=dictionary).decompress(data)
+        else:
+            raw = data
+        text = raw.decode("utf-8")
+        with self._blob_lock:
+            self._blob_cache[value_hash] = text
+            while len(self._blob_cache) > self.BLOB_CACHE_SIZE:
+                self._blob_cache.popitem(last=False)
+        return text
+
+    def _zstd_dictionary(self, dict_id: int) -> Any:
+        """Load a trained zstd dictionary (None without zstandard)."""
+        dictionary = self._zstd_dicts.get(dict_id)
+        if dictionary is None:
+            try:
+                import zstandard
+            except ImportError:
+                return None
+            # Own connection: this may run inside a statement of the pooled one
+            conn = sqlite3.connect(self.db_path)
+            try:
+                row = conn.execute(
+                    "SELECT data FROM memory_dictionaries WHERE id = ?", (dict_id,)
+                ).fetchone()
+            finally:
+                conn.close()
+            if row is None:
+                return None
+            dictionary = zstandard.ZstdCompressionDict(row[0])
+            self._zstd_dicts[dict_id] = dictionary
+        return dictionary
+
+    def train_dictionary(self, samples: int = 2000, dict_size: int = 64 * 1024) -> int:
+        """Train a zstd dictionary on stored blobs and compress new ones with it.
+        
+        Shared phrasing across entries (report headers, test boilerplate)
+        then compresses well even in values too small to compress alone.
+        Existing blobs keep their codec. Other processes pick the
+        dictionary up when they next open the store.
+        
+        Args:
+            samples: Most recent blobs to train on
+            dict_size: Dictionary size in bytes
+            
+        Returns:
+            Id of the new dictionary.
+        """
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Dictionary compression requires zstandard (pip install zstandard)")
+        cursor = self._conn.execute(
+            """SELECT memory_blob_text(hash, codec, dict_id, data) FROM memory_blobs
+               ORDER BY rowid DESC LIMIT ?""",
+            (samples,)
+        )
+        texts = [row[0].encode("utf-8") for row in cursor.fetchall()]
+        dictionary = zstandard.train_dictionary(dict_size, texts)
+        with self.batch():
+            dict_id = self._conn.execute(
+                "INSERT INTO memory_dictionaries (data) VALUES (?)", (dictionary.as_bytes(),)
+            ).lastrowid
+            self._conn.execute(
+                "INSERT OR REPLACE INTO memory_state (name, value) VALUES ('zstd_dictionary', ?)",
+                (dict_id,)
+            )
+        self.dictionary_id = dict_id
+        return dict_id
+
+    def storage_stats(self) -> Dict[str, Any]:
+        """Report how much space blob deduplication and compression save.
+        
+        Returns:
+            Dict with value counts and byte totals: ``logical_bytes`` is
+            what all values would take inline, ``stored_bytes`` what they
+            take now, plus dedup and compression ratios.
+        """
+        self._flush_pending()
+        conn = self._conn
+        inline_count, inline_bytes = conn.execute(
+            """SELECT COUNT(*), COALESCE(SUM(length(CAST(value AS BLOB))), 0)
+               FROM memories WHERE value_hash IS NULL"""
+        ).fetchone()
+        blob_refs, referenced_bytes = conn.execute(
+            """SELECT COUNT(*), COALESCE(SUM(b.size), 0)
+               FROM memories m JOIN memory_blobs b ON b.hash = m.value_hash"""
+        ).fetchone()
+        blob_count, unique_bytes, compressed_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(length(data)), 0) FROM memory_blobs"
+        ).fetchone()
+        logical = inline_bytes + referenced_bytes
+        stored = inline_bytes + compressed_bytes
+        return {
+            "inline_values": inline_count,
+            "blob_values": blob_refs,
+            "blobs": blob_count,
+            "logical_bytes": logical,
+            "stored_bytes": stored,
+            "saved_bytes": logical - stored,
+            "dedup_ratio": referenced_bytes / unique_bytes if unique_bytes else 1.0,
+            "compression_ratio": unique_bytes / compressed_bytes if compressed_bytes else 1.0,
+            "dictionary_id": self.dictionary_id,
+        }
+
+    @contextmanager
+    def batch(self) -> Iterator["MemoryLayer"]:
+        """Group writes made on this thread into a single transaction.
+        
+        Commits on exit (one fsync for the whole batch) and rolls back if
+        the block raises. Nested batches join the outermost transaction.
+        
+        Example:
+            with memory.batch():
+                for result in results:
+                    memory.add(result.key, result.value)
+        """
+        conn = self._conn
+        depth = getattr(self._local, "batch_depth", 0)
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.batch_depth = depth + 1
+        try:
+            yield self
+        except BaseException:
+            self._local.batch_depth = depth
+            if depth == 0:
+                conn.execute("ROLLBACK")
+                # Rows read inside the transaction may have been cached
+                self._invalidate()
+            raise
+        self._local.batch_depth = depth
+        if depth == 0:
+            conn.execute("COMMIT")
+            self._notify_watchers()
+
+    @staticmethod
+    def _item_to_params(item: MemoryItem) -> _UpsertParams:
+        """Convert an add_many() item into UPSERT_SQL parameters."""
+        now = datetime.utcnow()
+        expires_at = None
+        if isinstance(item, dict):
+            key, value, metadata = item["key"], item["value"], item.get("metadata")
+            # Imported entries keep their original timestamps
+            created_at = item.get("created_at") or now.isoformat()
+            updated_at = item.get("updated_at") or now.isoformat()
+            expires_at = item.get("expires_at") or _expires_at(now, item.get("ttl"))
+        else:
+            if len(item) == 3:
+                key, value, metadata = item
+            else:
+                key, value = item
+                metadata = None
+            created_at = updated_at = now.isoformat()
+        metadata_json = json.dumps(metadata) if metadata else None
+        return (key, value, metadata_json, created_at, updated_at, expires_at)
+
+    def get(self, key: str) -> Optional[MemoryEntry]:
         """Get a memory entry.
         
         Args:
             key: Memory key
             
         Returns:
-            Memory dict with value, metadata, created_at, updated_at or None.
+            MemoryEntry with value, metadata, created_at, updated_at or None.
+        """
+        if self.write_behind:
+            found, entry = self._buffered_entry(key)
+            if found:
+                return entry
+        cache = self.cache
+        if cache is not None:
+            self._check_data_version()
+            found, entry = cache.lookup(key)
+            if found:
+                return entry.copy() if entry is not None else None
+            generation = cache.generation
+        cursor = self._conn.execute(
+            f"""SELECT {self.ENTRY_COLUMNS} FROM memories
+                WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)""",
+            (key, datetime.utcnow().isoformat())
+        )
+        row = cursor.fetchone()
+        entry = MemoryEntry.from_row(row) if row else None
+        if cache is not None:
+            cache.put(key, entry, generation)
+            return entry.copy() if entry is not None else None
+        return entry
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, MemoryEntry]:
+        """Get several memory entries with one query per chunk of keys.
+        
+        Args:
+            keys: Memory keys
+            
+        Returns:
+            Dict of key -> MemoryEntry for the keys that exist.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                "SELECT key, value, metadata, created_at, updated_at FROM memories WHERE key = ?",
-                (key,)
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, MemoryEntry] = {}
+        if self.write_behind:
+            missing = []
+            for key in keys:
+                buffered, entry = self._buffered_entry(key)
+                if not buffered:
+                    missing.append(key)
+                elif entry is not None:
+                    found[key] = entry
+            keys = missing
+        cache = self.cache
+        if cache is not None:
+            self._check_data_version()
+            missing = []
+            for key in keys:
+                hit, entry = cache.lookup(key)
+                if not hit:
+                    missing.append(key)
+                elif entry is not None:
+                    found[key] = entry.copy()
+            keys = missing
+            generation = cache.generation
+        for start in range(0, len(keys), self.GET_MANY_CHUNK_SIZE):
+            chunk = keys[start:start + self.GET_MANY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self._conn.execute(
+                f"""SELECT {self.ENTRY_COLUMNS}
+                    FROM memories WHERE key IN ({placeholders})
+                    AND (expires_at IS NULL OR expires_at > ?)""",
+                chunk + [datetime.utcnow().isoformat()]
             )
-            row = cursor.fetchone()
-            if row:
-                return {
-                    "key": row["key"],
-                    "value": row["value"],
-                    "metadata": json.loads(row["metadata"]) if row["metadata"] else None,
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"]
-                }
-        return None
+            for row in cursor.fetchall():
+                found[row["key"]] = MemoryEntry.from_row(row)
+        if cache is not None:
+            for key in keys:
+                entry = found.get(key)
+                cache.put(key, entry.copy() if entry is not None else None, generation)
+        return found
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Get read cache counters (hits, misses, hit_rate, ...).
+        
+        Returns:
+            Stats dict, or None if the cache is disabled.
+        """
+        return self.cache.stats() if self.cache is not None else None
+
+    def _invalidate(self, keys: Optional[Iterable[str]] = None) -> None:
+        """Drop keys (or everything) from the read cache, if enabled."""
+        if self.cache is not None:
+            self.cache.invalidate(keys)
+
+    def _check_data_version(self) -> None:
+        """Flush the read cache if another connection has committed.
+        
+        SQLite bumps ``PRAGMA data_version`` on a connection whenever a
+        different connection (another thread's or another process's)
+        commits, which is exactly when cached rows may be stale.
+        """
+        now = time.monotonic()
+        if now - getattr(self._local, "data_version_checked", 0.0) < self.CACHE_RECHECK_INTERVAL:
+            return
+        self._local.data_version_checked = now
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if getattr(self._local, "data_version", version) != version:
+            self.cache.invalidate()
+        self._local.data_version = version
 
     def delete(self, key: str) -> bool:
         """Delete a memory entry.
@@ -111,10 +1197,14 @@ class MemoryLayer:
         Returns:
             True if deleted.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("DELETE FROM memories WHERE key = ?", (key,))
-            conn.commit()
-            return cursor.rowcount > 0
+        with self._buffer_lock:
+            buffered = self._write_buffer.pop(key, None) is not None
+        if key in self._flushing:
+            self.flush()  # wait for the in-flight commit so the delete wins
+        cursor = self._conn.execute("DELETE FROM memories WHERE key = ?", (key,))
+        self._invalidate([key])
+        self._notify_watchers()
+        return cursor.rowcount > 0 or buffered
 
     def list_keys(self, prefix: Optional[str] = None, limit: int = 100) -> List[str]:
         """List memory keys, optionally with prefix filter.
@@ -126,21 +1216,116 @@ class MemoryLayer:
         Returns:
             List of matching keys.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            if prefix:
-                cursor = conn.execute(
-                    "SELECT key FROM memories WHERE key LIKE ? ORDER BY updated_at DESC LIMIT ?",
-                    (f"{prefix}%", limit)
-                )
-            else:
-                cursor = conn.execute(
-                    "SELECT key FROM memories ORDER BY updated_at DESC LIMIT ?",
-                    (limit,)
-                )
-            return [row[0] for row in cursor.fetchall()]
+        return self.scan(prefix, with_values=False, limit=limit)
+
+    def scan(self, prefix: Optional[str] = None, with_values: bool = True,
+             limit: Optional[int] = None) -> Union[List[MemoryEntry], List[str]]:
+        """List memories under a key prefix, newest first, in one query.
+        
+        Args:
+            prefix: Optional key prefix filter
+            with_values: Return full MemoryEntry objects instead of just keys
+            limit: Maximum entries to return (None = all)
+            
+        Returns:
+            List of MemoryEntry objects, or of keys if with_values is False.
+        """
+        self._flush_pending()
+        columns = self.ENTRY_COLUMNS if with_values else "key"
+        where, params = self._prefix_range(prefix)
+        cursor = self._conn.execute(
+            f"SELECT {columns} FROM memories WHERE {where} ORDER BY updated_at DESC LIMIT ?",
+            params + [-1 if limit is None else limit]
+        )
+        if with_values:
+            return [MemoryEntry.from_row(row) for row in cursor.fetchall()]
+        return [row[0] for row in cursor.fetchall()]
 
-    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Simple text search in memory values.
+    def scan_page(self, prefix: Optional[str] = None, after: Optional[str] = None,
+                  limit: int = 1000, with_values: bool = False
+                  ) -> Tuple[Union[List[MemoryEntry], List[str]], Optional[str]]:
+        """Fetch one page of memories in key order (keyset pagination).
+        
+        Each page is an index range seek starting just past ``after``, so
+        paging stays fast and consistent however deep it goes.
+        
+        Args:
+            prefix: Optional key prefix filter
+            after: Cursor returned by the previous page (None = first page)
+            limit: Maximum entries per page
+            with_values: Return full MemoryEntry objects instead of just keys
+            
+        Returns:
+            (entries, next_cursor) - next_cursor is None on the last page.
+        """
+        self._flush_pending()
+        columns = self.ENTRY_COLUMNS if with_values else "key"
+        where, params = self._prefix_range(prefix, after)
+        cursor = self._conn.execute(
+            f"SELECT {columns} FROM memories WHERE {where} ORDER BY key LIMIT ?",
+            params + [limit]
+        )
+        rows = cursor.fetchall()
+        next_cursor = rows[-1]["key"] if len(rows) == limit else None
+        if with_values:
+            return [MemoryEntry.from_row(row) for row in rows], next_cursor
+        return [row[0] for row in rows], next_cursor
+
+    def iter_scan(self, prefix: Optional[str] = None, with_values: bool = False,
+                  page_size: int = 1000) -> Iterator[Union[Dict[str, Any], str]]:
+        """Iterate over every matching memory in key order, page by page.
+        
+        Holds at most one page in memory, so it is safe on stores with
+        millions of keys.
+        
+        Args:
+            prefix: Optional key prefix filter
+            with_values: Yield full MemoryEntry objects instead of just keys
+            page_size: Entries fetched per query
+            
+        Yields:
+            MemoryEntry objects, or keys if with_values is False.
+        """
+        after = None
+        while True:
+            entries, after = self.scan_page(prefix, after, page_size, with_values)
+            yield from entries
+            if after is None:
+                return
+
+    @staticmethod
+    def _prefix_range(prefix: Optional[str], after: Optional[str] = None) -> Tuple[str, List[Any]]:
+        """Build an index-friendly WHERE clause for a key prefix.
+        
+        ``key LIKE 'p%'`` can't use the key index (LIKE is case-insensitive)
+        and treats ``_``/``%`` in the prefix as wildcards. A half-open range
+        ``p <= key < p_next`` is an exact, indexed equivalent. A pagination
+        cursor is folded into the lower bound so SQLite seeks straight to it.
+        """
+        if after is not None and (not prefix or after >= prefix):
+            clauses, params = ["key > ?"], [after]
+        elif prefix:
+            clauses, params = ["key >= ?"], [prefix]
+        else:
+            clauses, params = [], []
+        if prefix:
+            # Smallest string greater than every string starting with prefix
+            upper = prefix.rstrip(chr(0x10FFFF))
+            if upper:
+                next_char = ord(upper[-1]) + 1
+                if 0xD800 <= next_char <= 0xDFFF:
+                    next_char = 0xE000  # surrogates can't be stored as UTF-8
+                clauses.append("key < ?")
+                params.append(upper[:-1] + chr(next_char))
+        return " AND ".join(clauses) or "1", params
+
+    def search(self, query: str, limit: int = 10) -> List[MemoryEntry]:
+        """Full-text search in memory values, best matches first.
+        
+        Uses the FTS5 index ranked by BM25. Bare words must all match,
+        "quoted text" matches as a phrase and a trailing * matches a
+        prefix (e.g. ``bitcoin "buy order" trad*``). Falls back to a
+        substring LIKE scan, newest first, when FTS5 is unavailable.
         
         Args:
             query: Search query
@@ -149,27 +1334,95 @@ class MemoryLayer:
         Returns:
             List of matching memories.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                """SELECT key, value, metadata, created_at, updated_at 
-                   FROM memories 
-                   WHERE value LIKE ? 
-                   ORDER BY updated_at DESC LIMIT ?""",
-                (f"%{query}%", limit)
-            )
-            return [
-                {
-                    "key": row["key"],
-                    "value": row["value"],
-                    "metadata": json.loads(row["metadata"]) if row["metadata"] else None,
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"]
-                }
-                for row in cursor.fetchall()
-            ]
-
-    def get_recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        self._flush_pending()
+        match = self._fts_query(query) if self.fts_enabled else None
+        if match:
+            try:
+                cursor = self._conn.execute(
+                    f"""SELECT {self.ENTRY_COLUMNS}
+                        FROM memories_fts
+                        JOIN memories ON memories.id = memories_fts.rowid
+                        WHERE memories_fts MATCH ?
+                        ORDER BY memories_fts.rank LIMIT ?""",
+                    (match, limit)
+                )
+                return [MemoryEntry.from_row(row) for row in cursor.fetchall()]
+            except sqlite3.OperationalError:
+                pass
+        return self._search_like(query, limit)
+
+    def _search_like(self, query: str, limit: int) -> List[MemoryEntry]:
+        """Substring search used when FTS5 cannot serve the query."""
+        cursor = self._conn.execute(
+            f"""SELECT {self.ENTRY_COLUMNS}
+                FROM memories
+                WHERE {_value_sql('memories')} LIKE ?
+                ORDER BY updated_at DESC LIMIT ?""",
+            (f"%{query}%", limit)
+        )
+        return [MemoryEntry.from_row(row) for row in cursor.fetchall()]
+
+    def semantic_search(self, query_vector: Sequence[float], k: int = 10,
+                        exact: bool = False) -> List[MemoryEntry]:
+        """Find the memories whose embeddings are closest to a query vector.
+        
+        Only memories stored with an embedding of the same dimension are
+        considered. Small stores are searched exactly; from IVF_THRESHOLD
+        vectors on an approximate IVF index is used (needs numpy).
+        
+        Args:
+            query_vector: Query embedding
+            k: Maximum results
+            exact: Force an exact brute-force search
+            
+        Returns:
+            List of memories, most similar first, each with a "score"
+            (cosine similarity).
+        """
+        self._flush_pending()
+        index = self._get_vector_index(len(query_vector), exact)
+        hits = index.search(query_vector, k)
+        if not hits:
+            return []
+        placeholders = ",".join("?" * len(hits))
+        cursor = self._conn.execute(
+            f"""SELECT id, {self.ENTRY_COLUMNS}
+                FROM memories WHERE id IN ({placeholders})""",
+            [memory_id for memory_id, _ in hits]
+        )
+        rows = {row["id"]: row for row in cursor.fetchall()}
+        results = []
+        for memory_id, score in hits:
+            if memory_id in rows:
+                entry = MemoryEntry.from_row(rows[memory_id])
+                entry.score = score
+                results.append(entry)
+        return results
+
+    def _get_vector_index(self, dim: int, exact: bool) -> VectorIndex:
+        """Return the cached index for a dimension, reloading it if stale."""
+        with self._vector_lock:
+            version = self._conn.execute(
+                "SELECT value FROM memory_state WHERE name = 'embedding_version'"
+            ).fetchone()[0]
+            key = -dim if exact else dim
+            built_at, index = self._vector_indexes.get(key, (None, None))
+            if built_at != version:
+                cursor = self._conn.execute(
+                    "SELECT memory_id, vector FROM memory_embeddings WHERE dim = ?", (dim,)
+                )
+                ids: List[int] = []
+                blobs: List[bytes] = []
+                for memory_id, blob in cursor:
+                    ids.append(memory_id)
+                    blobs.append(blob)
+                threshold = len(ids) + 1 if exact else self.IVF_THRESHOLD
+                # Passing the old index lets IVF keep its trained centroids
+                index = build_index(dim, ids, blobs, threshold, self.IVF_NPROBE, previous=index)
+                self._vector_indexes[key] = (version, index)
+            return index
+
+    def get_recent(self, limit: int = 10) -> List[MemoryEntry]:
         """Get most recently updated memories.
         
         Args:
@@ -178,24 +1431,14 @@ class MemoryLayer:
         Returns:
             List of recent memories.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                """SELECT key, value, metadata, created_at, updated_at 
-                   FROM memories 
-                   ORDER BY updated_at DESC LIMIT ?""",
-                (limit,)
-            )
-            return [
-                {
-                    "key": row["key"],
-                    "value": row["value"],
-                    "metadata": json.loads(row["metadata"]) if row["metadata"] else None,
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"]
-                }
-                for row in cursor.fetchall()
-            ]
+        self._flush_pending()
+        cursor = self._conn.execute(
+            f"""SELECT {self.ENTRY_COLUMNS}
+                FROM memories
+                ORDER BY updated_at DESC LIMIT ?""",
+            (limit,)
+        )
+        return [MemoryEntry.from_row(row) for row in cursor.fetchall()]
 
     def count(self) -> int:
         """Get total number of memory entries.
@@ -203,34 +1446,452 @@ class MemoryLayer:
         Returns:
             Count of entries.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM memories")
-            return cursor.fetchone()[0]
+        self._flush_pending()
+        cursor = self._conn.execute("SELECT COUNT(*) FROM memories")
+        return cursor.fetchone()[0]
 
-    def export(self) -> List[Dict[str, Any]]:
+    def query(self, where: Optional[Dict[str, Any]] = None, prefix: Optional[str] = None,
+              since: Optional[Union[datetime, str]] = None,
+              until: Optional[Union[datetime, str]] = None,
+              order_by: str = "-updated_at", limit: Optional[int] = 100) -> List[MemoryEntry]:
+        """Filter memories by metadata fields inside SQLite.
+        
+        Fields are read with JSON1's json_extract(), so only matching rows
+        leave the database. Fields declared with index_metadata() are
+        answered from their index instead of scanning every row.
+        
+        Args:
+            where: Metadata field -> condition. A plain value matches by
+                equality (None matches a missing field), a list/tuple/set
+                matches any of its values and a dict applies operators,
+                e.g. ``{"agent": "autotester", "success": False,
+                "exit_code": {">": 0}}``
+            prefix: Optional key prefix filter
+            since: Only entries updated at or after this time (UTC)
+            until: Only entries updated before this time (UTC)
+            order_by: "key", "created_at", "updated_at" or a metadata
+                field; prefix with "-" for descending order
+            limit: Maximum entries to return (None = all)
+        
+        Returns:
+            List of matching MemoryEntry objects.
+        """
+        self._flush_pending()
+        clause, params = self._prefix_range(prefix)
+        clauses = [clause, "(expires_at IS NULL OR expires_at > ?)"]
+        params.append(datetime.utcnow().isoformat())
+        if since is not None:
+            clauses.append("updated_at >= ?")
+            params.append(since.isoformat() if isinstance(since, datetime) else since)
+        if until is not None:
+            clauses.append("updated_at < ?")
+            params.append(until.isoformat() if isinstance(until, datetime) else until)
+        for field, condition in (where or {}).items():
+            field_clause, field_params = self._metadata_condition(field, condition)
+            clauses.append(field_clause)
+            params.extend(field_params)
+        
+        column = order_by.lstrip("-")
+        if column not in self.QUERY_ORDER_COLUMNS:
+            column = self._metadata_expr(column)
+        direction = "DESC" if order_by.startswith("-") else "ASC"
+        cursor = self._conn.execute(
+            f"""SELECT {self.ENTRY_COLUMNS} FROM memories
+                WHERE {" AND ".join(clauses)} ORDER BY {column} {direction} LIMIT ?""",
+            params + [-1 if limit is None else limit]
+        )
+        return [MemoryEntry.from_row(row) for row in cursor.fetchall()]
+
+    def index_metadata(self, field: str) -> None:
+        """Index a hot metadata field so query() can seek on it.
+        
+        Creates an index on the same json_extract() expression query()
+        filters and sorts by, so SQLite uses it automatically. Safe to call
+        repeatedly; the index persists in the database file.
+        
+        Args:
+            field: Metadata field name (dots address nested objects)
+        """
+        name = "idx_memories_meta_" + field.replace(".", "__")
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON memories({self._metadata_expr(field)})"
+        )
+
+    @classmethod
+    def _metadata_condition(cls, field: str, condition: Any) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause for one query() metadata condition."""
+        expr = cls._metadata_expr(field)
+        if condition is None:
+            return f"{expr} IS NULL", []
+        if isinstance(condition, (list, tuple, set)):
+            values = list(condition)
+            if not values:
+                return "0", []
+            return f"{expr} IN ({', '.join('?' * len(values))})", values
+        if isinstance(condition, dict):
+            clauses, params = [], []
+            for operator, value in condition.items():
+                if operator not in cls.QUERY_OPERATORS:
+                    raise ValueError(f"Unknown query operator: {operator}")
+                clauses.append(f"{expr} {operator} ?")
+                params.append(value)
+            return " AND ".join(clauses) or "1", params
+        return f"{expr} = ?", [condition]
+
+    @staticmethod
+    def _metadata_expr(field: str) -> str:
+        """SQL expression reading a metadata field.
+        
+        The JSON path is inlined rather than bound so the expression is
+        identical to the one in index_metadata()'s index, which is what
+        lets SQLite match the two; the field name is validated first.
+        """
+        if not _METADATA_FIELD_PATTERN.match(field):
+            raise ValueError(f"Invalid metadata field name: {field!r}")
+        return f"json_extract(metadata, '$.{field}')"
+
+    def export(self) -> List[MemoryEntry]:
         """Export all memories.
         
+        Loads everything into memory; prefer iter_export() for large stores.
+        
         Returns:
             List of all memory entries.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
-                "SELECT key, value, metadata, created_at, updated_at FROM memories"
-            )
-            return [
-                {
-                    "key": row["key"],
-                    "value": row["value"],
-                    "metadata": json.loads(row["metadata"]) if row["metadata"] else None,
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"]
-                }
-                for row in cursor.fetchall()
-            ]
+        return list(self.iter_export())
+
+    def iter_export(self, prefix: Optional[str] = None,
+                    page_size: int = 1000) -> Iterator[MemoryEntry]:
+        """Stream all memories in key order, one page in memory at a time.
+        
+        Args:
+            prefix: Optional key prefix filter
+            page_size: Entries fetched per query
+            
+        Yields:
+            MemoryEntry objects.
+        """
+        return self.iter_scan(prefix, with_values=True, page_size=page_size)
+
+    def export_ndjson(self, path: str, compression: Optional[str] = None,
+                      prefix: Optional[str] = None) -> int:
+        """Stream memories to a newline-delimited JSON file.
+        
+        Args:
+            path: Output file
+            compression: "gzip", "zstd" or None (inferred from a .gz/.zst suffix)
+            prefix: Optional key prefix filter
+            
+        Returns:
+            Number of entries written.
+        """
+        written = 0
+        with _open_ndjson(path, "w", compression) as f:
+            for entry in self.iter_export(prefix):
+                f.write(entry.to_json())
+                f.write("\n")
+                written += 1
+        return written
+
+    def import_ndjson(self, path: str, compression: Optional[str] = None,
+                      batch_size: int = 10000) -> int:
+        """Bulk-load memories from a newline-delimited JSON file.
+        
+        The file is streamed and written in transactions of batch_size
+        entries, so neither the file nor the WAL has to fit in memory.
+        Existing keys are overwritten but keep their created_at.
+        
+        Args:
+            path: Input file written by export_ndjson (or any NDJSON with
+                key/value[/metadata/created_at/updated_at] fields)
+            compression: "gzip", "zstd" or None (inferred from a .gz/.zst suffix)
+            batch_size: Entries per transaction
+            
+        Returns:
+            Number of entries imported.
+        """
+        imported = 0
+        with _open_ndjson(path, "r", compression) as f:
+            entries = (json.loads(line) for line in f if line.strip())
+            while True:
+                written = self.add_many(islice(entries, batch_size))
+                imported += written
+                if written < batch_size:
+                    return imported
+
+    def set_quota(self, prefix: str, max_entries: Optional[int],
+                  policy: str = "lru") -> None:
+        """Cap how many entries a key namespace may hold.
+        
+        Quotas are enforced by sweep(), not on write, so a namespace may
+        briefly overshoot between sweeps.
+        
+        Args:
+            prefix: Key prefix of the namespace (e.g. "test_result_")
+            max_entries: Maximum entries to keep (None removes the quota)
+            policy: "lru" evicts the least recently updated entries,
+                "oldest" the earliest created
+        """
+        if max_entries is None:
+            self.quotas.pop(prefix, None)
+            return
+        if policy not in self.EVICTION_ORDER:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.quotas[prefix] = (max_entries, policy)
+
+    def sweep(self, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """Run one incremental cleanup step.
+        
+        Deletes up to batch_size expired entries, evicts up to batch_size
+        entries from each over-quota namespace, deletes up to batch_size
+        unreferenced value blobs and change-feed rows beyond
+        CHANGE_LOG_SIZE, then releases up to
+        VACUUM_PAGES_PER_SWEEP free pages back to the filesystem. Each
+        part is its own short transaction so writers aren't starved;
+        call repeatedly (or use start_sweeper()) to catch up.
+        
+        Args:
+            batch_size: Max rows deleted per part (default SWEEP_BATCH_SIZE)
+            
+        Returns:
+            Dict with "expired", "evicted", "blobs_freed",
+            "changes_pruned" and "vacuumed_pages" counts.
+        """
+        self._flush_pending()
+        batch_size = batch_size or self.SWEEP_BATCH_SIZE
+        conn = self._conn
+        cursor = conn.execute(
+            """DELETE FROM memories WHERE id IN (
+                   SELECT id FROM memories
+                   WHERE expires_at IS NOT NULL AND expires_at <= ?
+                   LIMIT ?)""",
+            (datetime.utcnow().isoformat(), batch_size)
+        )
+        stats = {"expired": cursor.rowcount, "evicted": 0, "blobs_freed": 0,
+                 "changes_pruned": 0, "vacuumed_pages": 0}
+        for prefix, (max_entries, policy) in list(self.quotas.items()):
+            where, params = self._prefix_range(prefix)
+            count = conn.execute(
+                f"SELECT COUNT(*) FROM memories WHERE {where}", params
+            ).fetchone()[0]
+            excess = min(count - max_entries, batch_size)
+            if excess > 0:
+                cursor = conn.execute(
+                    f"""DELETE FROM memories WHERE id IN (
+                            SELECT id FROM memories WHERE {where}
+                            ORDER BY {self.EVICTION_ORDER[policy]} LIMIT ?)""",
+                    params + [excess]
+                )
+                stats["evicted"] += cursor.rowcount
+        if stats["expired"] or stats["evicted"]:
+            self._invalidate()
+            self._notify_watchers()
+        # Blobs whose last referencing memory was deleted or overwritten
+        cursor = conn.execute(
+            """DELETE FROM memory_blobs WHERE hash IN (
+                   SELECT hash FROM memory_blobs b
+                   WHERE NOT EXISTS (SELECT 1 FROM memories WHERE value_hash = b.hash)
+                   LIMIT ?)""",
+            (batch_size,)
+        )
+        stats["blobs_freed"] = cursor.rowcount
+        cursor = conn.execute(
+            """DELETE FROM memory_changes WHERE seq IN (
+                   SELECT seq FROM memory_changes
+                   WHERE seq <= (SELECT MAX(seq) FROM memory_changes) - ?
+                   ORDER BY seq LIMIT ?)""",
+            (self.CHANGE_LOG_SIZE, batch_size)
+        )
+        stats["changes_pruned"] = cursor.rowcount
+        # Skipped inside batch(): executescript would commit the open transaction
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if auto_vacuum == 2 and not conn.in_transaction:  # INCREMENTAL
+            free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # executescript steps the pragma to completion; execute() would
+            # free a single page
+            conn.executescript(f"PRAGMA incremental_vacuum({self.VACUUM_PAGES_PER_SWEEP});")
+            free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            stats["vacuumed_pages"] = free_before - free_after
+        return stats
+
+    def change_cursor(self) -> int:
+        """Sequence number of the latest change (a cursor for "from now on")."""
+        row = self._conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'memory_changes'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def changes(self, after: int = 0, prefix: Optional[str] = None,
+                limit: int = 1000) -> List[Dict[str, Any]]:
+        """Read committed changes after a cursor, oldest first.
+        
+        Writes still in the write-behind buffer appear once flushed.
+        Cursors older than the last CHANGE_LOG_SIZE changes may have
+        missed events pruned by sweep().
+        
+        Args:
+            after: Sequence number of the last change already seen
+            prefix: Optional key prefix filter
+            limit: Maximum changes to return
+            
+        Returns:
+            List of {"seq", "op" ("put" or "delete"), "key", "changed_at"}.
+        """
+        where, params = self._prefix_range(prefix)
+        cursor = self._conn.execute(
+            f"""SELECT seq, op, key, changed_at FROM memory_changes
+                WHERE seq > ? AND {where} ORDER BY seq LIMIT ?""",
+            [after] + params + [limit]
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    async def watch(self, prefix: Optional[str] = None, after: Optional[int] = None,
+                    with_entries: bool = False,
+                    poll_interval: float = 1.0) -> AsyncIterator[Dict[str, Any]]:
+        """Stream changes to memories as they are committed.
+        
+        Writes made through this MemoryLayer wake the iterator at once;
+        writes from other processes are picked up every poll_interval.
+        Save each event's "seq" to resume later without rescanning.
+        
+        Example:
+            async for change in memory.watch("research_"):
+                print(change["op"], change["key"])
+        
+        Args:
+            prefix: Optional key prefix filter
+            after: Resume after this sequence number (None = from now)
+            with_entries: Attach the current MemoryEntry of each "put" as
+                "entry" (None if it has since been deleted)
+            poll_interval: Seconds between checks for out-of-process writes
+            
+        Yields:
+            Change dicts as returned by changes().
+        """
+        loop = asyncio.get_running_loop()
+        if after is None:
+            after = await loop.run_in_executor(None, self.change_cursor)
+        waiter = (loop, asyncio.Event())
+        with self._watch_lock:
+            self._watchers.append(waiter)
+        try:
+            while True:
+                waiter[1].clear()
+                events = await loop.run_in_executor(
+                    None, self.changes, after, prefix, self.WATCH_BATCH_SIZE
+                )
+                if with_entries and events:
+                    keys = [event["key"] for event in events if event["op"] == "put"]
+                    entries = await loop.run_in_executor(None, self.get_many, keys)
+                    for event in events:
+                        if event["op"] == "put":
+                            event["entry"] = entries.get(event["key"])
+                for event in events:
+                    after = event["seq"]
+                    yield event
+                if len(events) < self.WATCH_BATCH_SIZE:
+                    try:
+                        await asyncio.wait_for(waiter[1].wait(), poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            with self._watch_lock:
+                self._watchers.remove(waiter)
+
+    async def publish_changes(self, bus: MessageBus, prefix: Optional[str] = None,
+                              after: Optional[int] = None, topic: str = "memory",
+                              sender: str = "memory") -> None:
+        """Publish every change on a MessageBus until cancelled.
+        
+        Changes go out as "<topic>.put" / "<topic>.delete" with the change
+        dict as payload, so agents can subscribe to "memory.*".
+        
+        Example:
+            task = asyncio.create_task(memory.publish_changes(bus, "research_"))
+        
+        Args:
+            bus: Message bus to publish on
+            prefix: Optional key prefix filter
+            after: Resume after this sequence number (None = from now)
+            topic: Topic prefix
+            sender: Sender name on published messages
+        """
+        async for change in self.watch(prefix, after):
+            await bus.publish(f"{topic}.{change['op']}", change, sender)
+
+    def _notify_watchers(self) -> None:
+        """Wake watch() iterators once a write has been committed."""
+        if not self._watchers or getattr(self._local, "batch_depth", 0):
+            return  # batch() notifies on commit
+        with self._watch_lock:
+            watchers = list(self._watchers)
+        for loop, event in watchers:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # event loop already closed
+
+    def start_sweeper(self, interval: float = 60.0) -> None:
+        """Run sweep() periodically on a background daemon thread.
+        
+        A step that hit its batch limit is followed immediately by
+        another, so a backlog drains without waiting for the interval.
+        
+        Args:
+            interval: Seconds between sweeps once caught up
+        """
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._sweeper_stop.clear()
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop, args=(interval,), name="memory-sweeper", daemon=True
+        )
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper, if running."""
+        if self._sweeper is None:
+            return
+        self._sweeper_stop.set()
+        if self._sweeper is not threading.current_thread():
+            self._sweeper.join()
+        self._sweeper = None
+
+    def _sweep_loop(self, interval: float) -> None:
+        """Background sweeper body."""
+        while not self._sweeper_stop.is_set():
+            try:
+                stats = self.sweep()
+            except sqlite3.Error as e:
+                print(f"Memory sweeper error: {e}")
+                stats = {}
+            backlog = (stats.get("expired", 0) >= self.SWEEP_BATCH_SIZE
+                       or stats.get("evicted", 0) > 0)
+            self._sweeper_stop.wait(0 if backlog else interval)
 
     def clear(self) -> None:
         """Clear all memories."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM memories")
-            conn.commit()
+        with self._flush_lock:
+            with self._buffer_lock:
+                self._write_buffer = {}
+            self._conn.execute("DELETE FROM memories")
+            self._conn.execute("DELETE FROM memory_blobs")
+        self._invalidate()
+        self._notify_watchers()
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Translate a user query into a safe FTS5 MATCH expression.
+        
+        Every term is quoted so FTS5 operators in user text are treated
+        literally; only phrases and trailing-* prefixes are honoured.
+        """
+        terms = []
+        for phrase, word in _FTS_TOKEN_PATTERN.findall(query):
+            text = phrase if phrase else word
+            prefix = not phrase and text.endswith("*")
+            text = text.rstrip("*").replace('"', '""')
+            if text.strip():
+                terms.append(f'"{text}"*' if prefix else f'"{text}"')
+        return " ".join(terms)
+
@@ -0,0 +1,129 @@
+"""Metrics - Cheap run statistics for the Dino Dynasty OS Scheduler."""
+
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+# Upper bounds (seconds) of the default histogram buckets, roughly 1-2.5-5
+# steps from a millisecond to ten minutes; one more bucket takes the rest
+DEFAULT_BOUNDS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram of non-negative values.
+    
+    Recording is a bisect over the bounds and a few additions, so it can
+    sit on every run. Quantiles are estimated by interpolating within the
+    bucket holding the requested rank.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BOUNDS):
+        """Initialize the histogram.
+        
+        Args:
+            bounds: Increasing bucket upper bounds
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Add one observation (negative values count as zero)."""
+        if value < 0:
+            value = 0.0
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1), or None if empty."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / count
+                return min(estimate, self.max)
+            seen += count
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary plus raw bucket counts (keyed by upper bound, "+Inf" last)."""
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.bounds, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class JobMetrics:
+    """Counters and histograms for the runs of one job (or of all jobs).
+    
+    ``lag`` is how long after its nominal due time a run actually started
+    (jitter, queueing for slots and rate limits included); ``duration`` is
+    how long the job function took. ``misfires`` counts runs dropped for
+    being later than the misfire grace time and ``skipped`` runs dropped
+    by the overlap policy.
+    """
+
+    __slots__ = ("lag", "duration", "runs", "successes", "failures",
+                 "misfires", "skipped", "cancelled", "last_error", "last_error_at")
+
+    def __init__(self):
+        self.lag = Histogram()
+        self.duration = Histogram()
+        self.runs = 0
+        self.successes = 0
+        self.failures = 0
+        self.misfires = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[datetime] = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact view: counters, last error and p50/p95/max timings."""
+        return {
+            "runs": self.runs,
+            "successes": self.successes,
+            "failures": self.failures,
+            "misfires": self.misfires,
+            "skipped": self.skipped,
+            "cancelled": self.cancelled,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at.isoformat() if self.last_error_at else None,
+            "lag_p50": self.lag.quantile(0.5),
+            "lag_p95": self.lag.quantile(0.95),
+            "lag_max": self.lag.max if self.lag.count else None,
+            "duration_p50": self.duration.quantile(0.5),
+            "duration_p95": self.duration.quantile(0.95),
+            "duration_max": self.duration.max if self.duration.count else None,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Everything, including full histograms."""
+        data = self.summary()
+        data["lag"] = self.lag.snapshot()
+        data["duration"] = self.duration.snapshot()
+        return data
+
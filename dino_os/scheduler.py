@@ -1,12 +1,22 @@
 """Scheduler - Cron-style job scheduling for Dino Dynasty OS."""
 
 import asyncio
-import re
+import functools
+import inspect
+import random
+import sqlite3
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from datetime import datetime
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from . import cron
+from .job_store import JobStore, callable_ref, resolve_callable
+from .lease import SQLiteLease
+from .metrics import JobMetrics
+from .timer_queue import HeapTimerQueue, TimerQueue, TimingWheel
 
 
 class ScheduleType(Enum):
@@ -16,6 +26,19 @@ class ScheduleType(Enum):
     ONCE = "once"
 
 
+class OverlapPolicy(Enum):
+    """What to do when a job comes due while max_instances are still running."""
+    SKIP = "skip"                        # drop this run
+    QUEUE = "queue"                      # run it when an instance finishes
+    CANCEL_PREVIOUS = "cancel_previous"  # cancel the oldest instance, then run
+
+
+class ExecutorType(Enum):
+    """Where sync job functions run (coroutine functions run on the event loop)."""
+    THREAD = "thread"
+    PROCESS = "process"  # for CPU-bound jobs; func and arguments must pickle
+
+
 @dataclass
 class ScheduledJob:
     """Represents a scheduled job."""
@@ -27,34 +50,212 @@ class ScheduledJob:
     kwargs: dict
     next_run: Optional[datetime]
     enabled: bool = True
+    last_run: Optional[datetime] = None
+    failures: int = 0
+    max_instances: int = 1
+    overlap: OverlapPolicy = OverlapPolicy.SKIP
+    executor: ExecutorType = ExecutorType.THREAD
+    jitter: float = 0.0  # max random delay added to each run, in seconds
+    group: Optional[str] = None
+    # Runtime state
+    fire_at: Optional[datetime] = field(default=None, repr=False, compare=False)  # next_run + jitter
+    tasks: Dict[asyncio.Task, None] = field(default_factory=dict, repr=False, compare=False)
+    queued: int = field(default=0, repr=False, compare=False)
+    metrics: JobMetrics = field(default_factory=JobMetrics, repr=False, compare=False)
+    is_coroutine: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.is_coroutine = asyncio.iscoroutinefunction(self.func)
+
+
+class JobGroup:
+    """Named set of jobs sharing a concurrency limit and/or a start rate.
+    
+    The rate is a token bucket: runs of the group's jobs start at most
+    ``rate`` times per second on average, with bursts of at most ``burst``
+    runs, so a crowd of jobs due together is spread out over time.
+    """
+
+    def __init__(self, name: str, max_concurrency: Optional[int] = None,
+                 rate: Optional[float] = None, burst: float = 1.0):
+        """Initialize the group.
+        
+        Args:
+            name: Group name
+            max_concurrency: Runs of the group's jobs allowed at once
+            rate: Average run starts per second (None = unlimited)
+            burst: Run starts allowed back to back before the rate applies
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.running = 0
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._tokens = burst
+        self._refilled: Optional[float] = None
+        self._bucket_lock = asyncio.Lock()  # token waiters are served in order
+
+    async def acquire(self) -> None:
+        """Wait for a concurrency slot and a rate token."""
+        if self._slots is not None:
+            await self._slots.acquire()
+        try:
+            if self.rate is not None:
+                await self._take_token()
+        except BaseException:
+            if self._slots is not None:
+                self._slots.release()
+            raise
+        self.running += 1
+
+    def release(self) -> None:
+        """Give back the concurrency slot taken by acquire."""
+        self.running -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    async def _take_token(self) -> None:
+        async with self._bucket_lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._refilled is not None:
+                    self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
 
 
 class Scheduler:
-    """Cron-style job scheduler."""
+    """Cron-style job scheduler.
+    
+    Due times are kept in a timer queue, so the run loop sleeps exactly
+    until the next job is due however many jobs are registered, and adding
+    a job that is due sooner wakes it early. The default heap backend
+    dispatches in O(log n); the "wheel" backend (a hierarchical timing
+    wheel) adds and cancels in O(1), for large numbers of short-lived
+    one-shot jobs such as timeouts, at the cost of 10 ms tick granularity.
+    
+    Each run is launched as its own task, so a slow job never delays the
+    others. Coroutine functions run on the event loop; sync functions run
+    on a thread pool (or a process pool, see configure_job). At most
+    max_concurrency runs execute at once; the rest wait their turn.
+    
+    With a job store, jobs survive restarts: specs are written when jobs
+    are added, changed or removed, and run state (next_run, last_run,
+    failures) is flushed in batches every STATE_FLUSH_INTERVAL seconds.
+    Runs missed while the process was down (or the loop was busy) are
+    handled by misfire_grace_time and coalesce.
+    
+    To keep jobs with the same period from all firing in the same instant,
+    a job can be given random jitter, spread_intervals staggers the first
+    runs of interval jobs across their period, and jobs can share a
+    JobGroup (add_group) that caps their concurrency and start rate.
+    
+    When several processes run a Scheduler with the same jobs, give each a
+    SQLiteLease with the same name: only the process holding the lease
+    launches runs. The others keep their schedules moving without running
+    anything, and take over when the leader stops renewing the lease.
+    
+    Each job keeps in-memory JobMetrics (start lag, run duration, outcome
+    counts, last error); list_jobs() shows a summary and metrics() the
+    full histograms.
+    """
+    
+    # Seconds between checks of a due job that is disabled
+    DISABLED_RECHECK = 1.0
     
-    # Cron pattern: minute hour day month day_of_week
-    CRON_PATTERN = re.compile(r'^(\*|[0-9,/-]+)\s+(\*|[0-9,/-]+)\s+(\*|[0-9,/-]+)\s+(\*|[0-9,/-]+)\s+(\*|[0-9,/-]+)$')
+    # Due jobs launched back to back before yielding to the event loop
+    DISPATCH_BATCH = 1000
+    
+    # Seconds between batched writes of job run state to the job store
+    STATE_FLUSH_INTERVAL = 1.0
 
-    def __init__(self):
-        """Initialize the scheduler."""
+    def __init__(self, max_concurrency: int = 100, thread_workers: Optional[int] = None,
+                 process_workers: Optional[int] = None, job_store: Optional[JobStore] = None,
+                 misfire_grace_time: Optional[float] = None, coalesce: bool = True,
+                 backend: Union[str, TimerQueue] = "heap", spread_intervals: bool = False,
+                 lease: Optional[SQLiteLease] = None):
+        """Initialize the scheduler.
+        
+        Args:
+            max_concurrency: Maximum job runs executing at once
+            thread_workers: Thread pool size for sync jobs (default: Python's)
+            process_workers: Process pool size for process jobs (default: CPU count)
+            job_store: Persist jobs here and load the ones already stored;
+                job functions must be importable by name and their
+                arguments JSON-serializable
+            misfire_grace_time: Seconds a run may be late and still run
+                (None = no limit); later runs are skipped
+            coalesce: Collapse a backlog of missed runs into one run
+                instead of replaying each of them
+            backend: "heap", "wheel", or a TimerQueue instance
+            spread_intervals: Stagger the first runs of interval jobs that
+                share a period evenly across it, instead of running each
+                new job immediately
+            lease: Only launch runs while holding this lease (renewed every
+                ttl/3 seconds, released on stop)
+        """
+        self.max_concurrency = max_concurrency
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.job_store = job_store
+        self.misfire_grace_time = misfire_grace_time
+        self.coalesce = coalesce
+        self.spread_intervals = spread_intervals
+        self.lease = lease
         self._jobs: Dict[str, ScheduledJob] = {}
+        self._groups: Dict[str, JobGroup] = {}
+        self._spread_counts: Dict[float, int] = {}  # interval -> jobs placed so far
+        self._totals = JobMetrics()  # all runs, including those of removed jobs
         self._running = False
         self._task: Optional[asyncio.Task] = None
+        self._lease_task: Optional[asyncio.Task] = None
+        if backend == "heap":
+            backend = HeapTimerQueue()
+        elif backend == "wheel":
+            backend = TimingWheel()
+        elif not isinstance(backend, TimerQueue):
+            raise ValueError(f"Unknown scheduler backend: {backend!r}")
+        self._queue: TimerQueue = backend
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._sleep_until: Optional[datetime] = None  # set while the loop waits
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._dirty: Dict[str, ScheduledJob] = {}  # run state awaiting a flush
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_future: Optional[asyncio.Future] = None
+        if job_store is not None:
+            self._load_jobs()
 
     def add_cron_job(self, job_id: str, cron_expr: str, func: Callable, *args, **kwargs) -> bool:
         """Add a cron-style job.
         
         Args:
             job_id: Unique job identifier
-            cron_expr: Cron expression (min hour day month dow)
+            cron_expr: Cron expression (min hour day month dow, in UTC) or
+                macro such as @daily; see cron.CronExpression
             func: Function to call
             *args: Positional arguments
             **kwargs: Keyword arguments
             
         Returns:
-            True if added successfully.
+            True if added successfully, False if the expression is invalid.
         """
-        if not self.CRON_PATTERN.match(cron_expr):
+        try:
+            cron.parse(cron_expr)
+        except ValueError:
             return False
         
         job = ScheduledJob(
@@ -67,19 +268,22 @@ class Scheduler:
             next_run=self._get_next_cron_time(cron_expr),
             enabled=True
         )
-        self._jobs[job_id] = job
+        self._add(job)
         return True
 
-    def add_interval_job(self, job_id: str, seconds: int, func: Callable, *args, **kwargs) -> None:
+    def add_interval_job(self, job_id: str, seconds: float, func: Callable, *args, **kwargs) -> None:
         """Add an interval job.
         
         Args:
             job_id: Unique job identifier
-            seconds: Interval in seconds
+            seconds: Interval in seconds (fractions allowed)
             func: Function to call
             *args: Positional arguments
             **kwargs: Keyword arguments
         """
+        first_run = datetime.utcnow()
+        if self.spread_intervals:
+            first_run += timedelta(seconds=seconds * self._spread_offset(float(seconds)))
         job = ScheduledJob(
             id=job_id,
             schedule_type=ScheduleType.INTERVAL,
@@ -87,10 +291,10 @@ class Scheduler:
             func=func,
             args=args,
             kwargs=kwargs,
-            next_run=datetime.utcnow(),
+            next_run=first_run,
             enabled=True
         )
-        self._jobs[job_id] = job
+        self._add(job)
 
     def add_one_shot_job(self, job_id: str, run_at: datetime, func: Callable, *args, **kwargs) -> None:
         """Add a one-time job.
@@ -112,7 +316,7 @@ class Scheduler:
             next_run=run_at,
             enabled=True
         )
-        self._jobs[job_id] = job
+        self._add(job)
 
     def remove_job(self, job_id: str) -> bool:
         """Remove a job.
@@ -123,7 +327,121 @@ class Scheduler:
         Returns:
             True if removed.
         """
-        return self._jobs.pop(job_id, None) is not None
+        removed = self._jobs.pop(job_id, None) is not None
+        self._dirty.pop(job_id, None)
+        self._queue.discard(job_id)
+        if removed and self.job_store is not None:
+            self.job_store.remove(job_id)
+        return removed
+
+    def configure_job(self, job_id: str, max_instances: Optional[int] = None,
+                      overlap: Optional[str] = None, executor: Optional[str] = None,
+                      jitter: Optional[float] = None, group: Optional[str] = None) -> bool:
+        """Change how a job's runs are executed.
+        
+        Args:
+            job_id: Job identifier
+            max_instances: Runs of this job allowed at the same time
+            overlap: "skip", "queue" or "cancel_previous" (see OverlapPolicy);
+                queued runs are capped at max_instances, and cancelling
+                a thread or process run only abandons it
+            executor: "thread" or "process" for sync functions
+            jitter: Delay each run by a random 0..jitter seconds
+            group: Name of a group from add_group ("" to leave the group)
+            
+        Returns:
+            True if the job exists.
+        
+        Raises:
+            ValueError: If an option is invalid.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        if max_instances is not None:
+            if max_instances < 1:
+                raise ValueError("max_instances must be at least 1")
+            job.max_instances = max_instances
+        if overlap is not None:
+            job.overlap = OverlapPolicy(overlap)
+        if executor is not None:
+            job.executor = ExecutorType(executor)
+        if jitter is not None:
+            if jitter < 0:
+                raise ValueError("jitter must not be negative")
+            job.jitter = jitter
+            self._push(job)
+        if group is not None:
+            if group and group not in self._groups:
+                raise ValueError(f"Unknown job group: {group}")
+            job.group = group or None
+        if self.job_store is not None:
+            self.job_store.save(self._job_row(job))
+        return True
+
+    def add_group(self, name: str, max_concurrency: Optional[int] = None,
+                  rate: Optional[float] = None, burst: float = 1.0) -> JobGroup:
+        """Create (or replace) a named job group; see JobGroup.
+        
+        Groups are not persisted. Jobs loaded from a job store that name a
+        group not defined yet run unrestricted until it is added.
+        
+        Args:
+            name: Group name
+            max_concurrency: Runs of the group's jobs allowed at once
+            rate: Average run starts per second (None = unlimited)
+            burst: Run starts allowed back to back before the rate applies
+            
+        Returns:
+            The new group.
+        """
+        group = JobGroup(name, max_concurrency, rate, burst)
+        self._groups[name] = group
+        return group
+
+    def get_group(self, name: str) -> Optional[JobGroup]:
+        """Get a job group by name."""
+        return self._groups.get(name)
+
+    def _spread_offset(self, interval: float) -> float:
+        """Fraction of the period at which the next job with this interval starts.
+        
+        Uses the base-2 van der Corput sequence (0, 1/2, 1/4, 3/4, 1/8, ...),
+        which keeps the start times evenly spaced however many jobs join.
+        """
+        n = self._spread_counts.get(interval, 0)
+        self._spread_counts[interval] = n + 1
+        fraction, scale = 0.0, 0.5
+        while n:
+            n, bit = divmod(n, 2)
+            fraction += bit * scale
+            scale /= 2
+        return fraction
+
+    def _add(self, job: ScheduledJob, persist: bool = True) -> None:
+        """Register a job (replacing any with the same id) and queue its first run."""
+        if persist and self.job_store is not None:
+            self.job_store.save(self._job_row(job))
+        self._jobs[job.id] = job
+        self._push(job)
+
+    def _push(self, job: ScheduledJob) -> None:
+        """Queue a job at its next_run, waking the loop if it is due sooner."""
+        if job.next_run is None:
+            job.fire_at = None
+            self._queue.discard(job.id)
+            return
+        fire_at = job.next_run
+        if job.jitter:
+            fire_at += timedelta(seconds=random.uniform(0, job.jitter))
+        job.fire_at = fire_at
+        self._queue.push(fire_at, job)
+        if self._sleep_until is not None and fire_at < self._sleep_until:
+            self._sleep_until = None
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # event loop already closed
 
     def get_job(self, job_id: str) -> Optional[ScheduledJob]:
         """Get a job by ID."""
@@ -137,78 +455,358 @@ class Scheduler:
                 "type": job.schedule_type.value,
                 "schedule": job.schedule,
                 "next_run": job.next_run.isoformat() if job.next_run else None,
-                "enabled": job.enabled
+                "enabled": job.enabled,
+                "max_instances": job.max_instances,
+                "overlap": job.overlap.value,
+                "executor": job.executor.value,
+                "jitter": job.jitter,
+                "group": job.group,
+                "running": len(job.tasks),
+                "queued": job.queued,
+                "failures": job.failures,
+                "metrics": job.metrics.summary()
             }
             for job in self._jobs.values()
         ]
 
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of run metrics, for all runs and per job.
+        
+        Returns:
+            Dict with "totals" (every run since start, removed jobs
+            included) and "jobs" (job id -> metrics); each has counters,
+            the last error and full lag/duration histograms in seconds.
+        """
+        return {
+            "running": sum(len(job.tasks) for job in self._jobs.values()),
+            "pending": len(self._queue),
+            "totals": self._totals.snapshot(),
+            "jobs": {job_id: job.metrics.snapshot() for job_id, job in self._jobs.items()},
+        }
+
     async def start(self) -> None:
         """Start the scheduler."""
         if not self._running:
             self._running = True
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            if self.lease is not None:
+                # Try for the lease before dispatching, so runs already due
+                # are not passed over while it is being acquired
+                await self._renew_lease()
+                self._lease_task = asyncio.create_task(self._lease_loop())
             self._task = asyncio.create_task(self._run_loop())
 
-    async def stop(self) -> None:
-        """Stop the scheduler."""
+    async def stop(self, wait: bool = True) -> None:
+        """Stop the scheduler.
+        
+        Args:
+            wait: Let running jobs finish (True) or cancel them (False)
+        """
         self._running = False
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        for loop_task in (self._task, self._lease_task):
+            if loop_task:
+                loop_task.cancel()
+                try:
+                    await loop_task
+                except asyncio.CancelledError:
+                    pass
+        
+        tasks = [task for job in self._jobs.values() for task in job.tasks]
+        for job in self._jobs.values():
+            job.queued = 0
+        if not wait:
+            for task in tasks:
+                task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_future is not None:
+            await asyncio.gather(self._flush_future, return_exceptions=True)
+        if self._dirty:
+            self.job_store.update_state(self._take_dirty())
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=not wait)
+        self._thread_pool = self._process_pool = None
+        if self.lease is not None and self.lease.held:
+            self.lease.release()  # let a standby take over without waiting for expiry
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this scheduler may launch runs (always True without a lease)."""
+        return self.lease is None or self.lease.held
 
     async def _run_loop(self) -> None:
-        """Main scheduler loop."""
+        """Main scheduler loop: run due jobs, then sleep until the next one."""
+        queue = self._queue
         while self._running:
+            self._wakeup.clear()
             now = datetime.utcnow()
-            for job_id, job in list(self._jobs.items()):
+            dispatched = 0
+            while dispatched < self.DISPATCH_BATCH:
+                entry = queue.pop_due(now)
+                if entry is None:
+                    break
+                dispatched += 1
+                fire_at, job = entry
+                if self._jobs.get(job.id) is not job or job.fire_at != fire_at:
+                    continue  # changed without going through the scheduler
+                due = job.next_run  # fire_at minus jitter; keeps the phase
                 if not job.enabled:
+                    job.next_run = now + timedelta(seconds=self.DISABLED_RECHECK)
+                    self._push(job)
                     continue
-                if job.next_run and now >= job.next_run:
-                    # Run the job
-                    try:
-                        if asyncio.iscoroutinefunction(job.func):
-                            await job.func(*job.args, **job.kwargs)
-                        else:
-                            job.func(*job.args, **job.kwargs)
-                    except Exception as e:
-                        print(f"Scheduler job {job_id} error: {e}")
-                    
-                    # Schedule next run
-                    if job.schedule_type == ScheduleType.INTERVAL:
-                        interval = int(job.schedule)
-                        job.next_run = now + timedelta(seconds=interval)
-                    elif job.schedule_type == ScheduleType.ONCE:
-                        self._jobs.pop(job_id, None)
-                        continue
-                    elif job.schedule_type == ScheduleType.CRON:
-                        job.next_run = self._get_next_cron_time(job.schedule)
+                
+                leader = self.lease is None or self.lease.held
+                grace = self.misfire_grace_time
+                if leader:
+                    if grace is None or (now - fire_at).total_seconds() <= grace:
+                        self._launch(job, due)
+                        job.last_run = now
+                    else:
+                        job.metrics.misfires += 1
+                        self._totals.misfires += 1
+                
+                # Schedule next run
+                if job.schedule_type == ScheduleType.INTERVAL:
+                    job.next_run = self._next_interval_run(due, float(job.schedule), now)
+                elif job.schedule_type == ScheduleType.ONCE:
+                    self.remove_job(job.id)
+                    continue
+                elif job.schedule_type == ScheduleType.CRON:
+                    job.next_run = self._get_next_cron_time(job.schedule, self._catch_up_from(due, now))
+                self._push(job)
+                if leader:
+                    self._mark_dirty(job)
             
-            await asyncio.sleep(1)
+            if dispatched == self.DISPATCH_BATCH:
+                await asyncio.sleep(0)  # let other tasks run, then carry on
+                continue
+            deadline = queue.peek()
+            self._sleep_until = deadline or datetime.max
+            timeout = None if deadline is None else max(0.0, (deadline - datetime.utcnow()).total_seconds())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._sleep_until = None
+
+    async def _lease_loop(self) -> None:
+        """Keep acquiring/renewing the lease while running."""
+        interval = self.lease.ttl / 3
+        while self._running:
+            await asyncio.sleep(interval)
+            await self._renew_lease()
 
-    def _get_next_cron_time(self, cron_expr: str) -> datetime:
+    async def _renew_lease(self) -> None:
+        try:
+            await self._loop.run_in_executor(None, self.lease.acquire)
+        except sqlite3.Error as e:
+            print(f"Scheduler lease error: {e}")
+
+    def _launch(self, job: ScheduledJob, due: Optional[datetime] = None) -> None:
+        """Start a run of a due job, applying its overlap policy.
+        
+        Args:
+            job: The job
+            due: Nominal time of this run, for lag metrics (None for runs
+                that waited in the overlap queue)
+        """
+        if len(job.tasks) >= job.max_instances:
+            if job.overlap == OverlapPolicy.SKIP:
+                job.metrics.skipped += 1
+                self._totals.skipped += 1
+                return
+            if job.overlap == OverlapPolicy.QUEUE:
+                job.queued = min(job.queued + 1, job.max_instances)
+                return
+            # CANCEL_PREVIOUS: tasks are kept in start order
+            oldest = next(iter(job.tasks))
+            del job.tasks[oldest]
+            oldest.cancel()
+            job.metrics.cancelled += 1
+            self._totals.cancelled += 1
+        task = self._loop.create_task(self._execute(job, due))
+        job.tasks[task] = None
+        task.add_done_callback(functools.partial(self._finished, job))
+
+    def _finished(self, job: ScheduledJob, task: asyncio.Task) -> None:
+        """Forget a finished run and start a queued one if any."""
+        job.tasks.pop(task, None)
+        if job.queued and self._running and self._jobs.get(job.id) is job:
+            job.queued -= 1
+            self._launch(job)
+
+    async def _execute(self, job: ScheduledJob, due: Optional[datetime] = None) -> None:
+        """Run a job once, within its group's and the global limits."""
+        group = self._groups.get(job.group) if job.group else None
+        if group is not None:
+            await group.acquire()
+        try:
+            async with self._slots:
+                metrics, totals = job.metrics, self._totals
+                if due is not None:
+                    lag = (datetime.utcnow() - due).total_seconds()
+                    metrics.lag.record(lag)
+                    totals.lag.record(lag)
+                metrics.runs += 1
+                totals.runs += 1
+                started = self._loop.time()
+                try:
+                    if job.is_coroutine:
+                        await job.func(*job.args, **job.kwargs)
+                    else:
+                        call = functools.partial(job.func, *job.args, **job.kwargs)
+                        result = await self._loop.run_in_executor(self._executor(job.executor), call)
+                        if inspect.isawaitable(result):
+                            await result
+                except Exception as e:
+                    print(f"Scheduler job {job.id} error: {e}")
+                    job.failures += 1
+                    self._mark_dirty(job)
+                    metrics.failures += 1
+                    totals.failures += 1
+                    metrics.last_error = totals.last_error = f"{type(e).__name__}: {e}"
+                    metrics.last_error_at = totals.last_error_at = datetime.utcnow()
+                else:
+                    metrics.successes += 1
+                    totals.successes += 1
+                duration = self._loop.time() - started
+                metrics.duration.record(duration)
+                totals.duration.record(duration)
+        finally:
+            if group is not None:
+                group.release()
+
+    def _executor(self, kind: ExecutorType) -> Executor:
+        """Pool for sync job functions, created on first use."""
+        if kind == ExecutorType.PROCESS:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._process_pool
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_workers, thread_name_prefix="scheduler"
+            )
+        return self._thread_pool
+
+    def _catch_up_from(self, due: datetime, now: datetime) -> datetime:
+        """Time after which missed runs of a late job should still happen."""
+        if self.coalesce:
+            return now  # the run just launched stands in for the backlog
+        if self.misfire_grace_time is not None:
+            return max(due, now - timedelta(seconds=self.misfire_grace_time))
+        return due  # replay every missed run
+
+    def _next_interval_run(self, due: datetime, seconds: float, now: datetime) -> datetime:
+        """Next run of an interval job, on the same phase as due."""
+        interval = timedelta(seconds=seconds)
+        next_run = due + interval
+        after = self._catch_up_from(due, now)
+        if next_run > after:
+            return next_run
+        return due + interval * ((after - due) // interval + 1)
+
+    def _get_next_cron_time(self, cron_expr: str,
+                            after: Optional[datetime] = None) -> Optional[datetime]:
         """Calculate next run time from cron expression.
         
-        This is a simplified implementation.
+        Args:
+            cron_expr: Cron expression
+            after: Reference time (default: now, UTC)
+        
+        Returns:
+            The first fire time after the reference time, or None if it
+            never fires again.
         """
-        now = datetime.utcnow()
-        parts = cron_expr.split()
-        if len(parts) != 5:
-            return now
-        
-        # Simple implementation: if current time matches, return next hour/day
-        minute, hour, _, _, _ = parts
-        
-        next_minute = now.minute + 1
-        next_hour = now.hour
-        next_day = now.day
-        
-        if next_minute >= 60:
-            next_minute = 0
-            next_hour += 1
-        if next_hour >= 24:
-            next_hour = 0
-            next_day += 1
-        
-        return now.replace(day=next_day, hour=next_hour, minute=next_minute, second=0, microsecond=0)
+        return cron.parse(cron_expr).next_after(after or datetime.utcnow())
+
+    # === Job store ===
+
+    def _load_jobs(self) -> None:
+        """Register the jobs saved in the job store."""
+        for row in self.job_store.load():
+            try:
+                options = row["options"]
+                job = ScheduledJob(
+                    id=row["id"],
+                    schedule_type=ScheduleType(row["schedule_type"]),
+                    schedule=row["schedule"],
+                    func=resolve_callable(row["func"]),
+                    args=tuple(row["args"]),
+                    kwargs=row["kwargs"],
+                    next_run=row["next_run"],
+                    enabled=row["enabled"],
+                    last_run=row["last_run"],
+                    failures=row["failures"],
+                    max_instances=options.get("max_instances", 1),
+                    overlap=OverlapPolicy(options.get("overlap", OverlapPolicy.SKIP.value)),
+                    executor=ExecutorType(options.get("executor", ExecutorType.THREAD.value)),
+                    jitter=options.get("jitter", 0.0),
+                    group=options.get("group"),
+                )
+            except (ImportError, AttributeError, ValueError) as e:
+                print(f"Scheduler job {row['id']} not loaded: {e}")
+                continue
+            self._add(job, persist=False)
+
+    @staticmethod
+    def _job_row(job: ScheduledJob) -> Dict[str, Any]:
+        """Job spec and state in the form a JobStore saves."""
+        return {
+            "id": job.id,
+            "schedule_type": job.schedule_type.value,
+            "schedule": job.schedule,
+            "func": callable_ref(job.func),
+            "args": job.args,
+            "kwargs": job.kwargs,
+            "options": {
+                "max_instances": job.max_instances,
+                "overlap": job.overlap.value,
+                "executor": job.executor.value,
+                "jitter": job.jitter,
+                "group": job.group,
+            },
+            "enabled": job.enabled,
+            "next_run": job.next_run,
+            "last_run": job.last_run,
+            "failures": job.failures,
+        }
+
+    def _mark_dirty(self, job: ScheduledJob) -> None:
+        """Queue a job's run state for the next batched store write."""
+        if self.job_store is None:
+            return
+        self._dirty[job.id] = job
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.STATE_FLUSH_INTERVAL, self._flush_state)
+
+    def _take_dirty(self) -> List[Dict[str, Any]]:
+        states = [
+            {"id": job.id, "next_run": job.next_run, "last_run": job.last_run,
+             "failures": job.failures}
+            for job in self._dirty.values()
+        ]
+        self._dirty.clear()
+        return states
+
+    def _flush_state(self) -> None:
+        """Write queued run state on a worker thread."""
+        self._flush_handle = None
+        if self._flush_future is not None and not self._flush_future.done():
+            # Previous write still running; try again next interval
+            self._flush_handle = self._loop.call_later(self.STATE_FLUSH_INTERVAL, self._flush_state)
+            return
+        future = self._loop.run_in_executor(None, self.job_store.update_state, self._take_dirty())
+        future.add_done_callback(self._flush_done)
+        self._flush_future = future
+
+    @staticmethod
+    def _flush_done(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Scheduler job store error: {future.exception()}")
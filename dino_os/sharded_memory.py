@@ -0,0 +1,362 @@
+"""Sharded Memory - Namespaced MemoryLayer stores in separate SQLite files for Dino Dynasty OS."""
+
+import heapq
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .memory_layer import MemoryEntry, MemoryItem, MemoryLayer
+
+# Shard names become file names
+_SHARD_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+class ShardedMemoryLayer:
+    """Routes keys to per-namespace MemoryLayer shards, one database file each.
+    
+    Every shard has its own SQLite write lock, so agents writing to
+    different namespaces no longer serialise behind each other. Keys are
+    routed by their longest matching prefix in ``routes``; anything
+    unrouted lands in the "default" shard. Agents can also take a whole
+    shard for themselves with namespace(agent.name).
+    
+    Per-key calls go straight to one shard. Calls that span keys (search,
+    count, scan, query, ...) run on every shard that can hold a match, in
+    parallel, and the results are merged.
+    """
+
+    DEFAULT_SHARD = "default"
+
+    def __init__(self, routes: Optional[Dict[str, str]] = None,
+                 base_dir: Optional[str] = None, default_path: Optional[str] = None,
+                 workers: int = 8, **memory_kwargs: Any):
+        """Initialize the sharded memory layer.
+        
+        Args:
+            routes: Key prefix -> shard name (e.g. {"research_": "autoresearcher"})
+            base_dir: Directory holding the shard files (<name>.db)
+            default_path: Database of the default shard (defaults to the
+                regular MemoryLayer database, so existing data stays visible)
+            workers: Threads used to fan queries out across shards
+            **memory_kwargs: Passed to every shard's MemoryLayer()
+        """
+        if base_dir is None:
+            base_dir = str(Path(__file__).parent.parent / "dino_memory")
+        self.base_dir = Path(base_dir)
+        self.default_path = default_path
+        self.memory_kwargs = memory_kwargs
+        self.routes: Dict[str, str] = {}
+        self.shards: Dict[str, MemoryLayer] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="memory-shard")
+        self.namespace(self.DEFAULT_SHARD)
+        for prefix, name in (routes or {}).items():
+            self.add_route(prefix, name)
+
+    # === Routing ===
+
+    def add_route(self, prefix: str, name: str) -> MemoryLayer:
+        """Send keys starting with prefix to the named shard.
+        
+        Only affects new writes; entries already stored elsewhere are not
+        moved.
+        
+        Args:
+            prefix: Key prefix
+            name: Shard name
+        
+        Returns:
+            The shard's MemoryLayer.
+        """
+        shard = self.namespace(name)
+        self.routes[prefix] = name
+        return shard
+
+    def namespace(self, name: str) -> MemoryLayer:
+        """Get (opening on first use) the MemoryLayer of a shard.
+        
+        Args:
+            name: Shard name, e.g. an agent name
+        
+        Returns:
+            The shard's MemoryLayer.
+        """
+        with self._lock:
+            shard = self.shards.get(name)
+            if shard is None:
+                if not _SHARD_NAME_PATTERN.match(name):
+                    raise ValueError(f"Invalid shard name: {name!r}")
+                if name == self.DEFAULT_SHARD and self.default_path is None:
+                    db_path = None
+                elif name == self.DEFAULT_SHARD:
+                    db_path = self.default_path
+                else:
+                    db_path = str(self.base_dir / f"{name}.db")
+                shard = MemoryLayer(db_path, **self.memory_kwargs)
+                self.shards[name] = shard
+            return shard
+
+    def shard_for(self, key: str) -> MemoryLayer:
+        """Shard that stores a key (longest matching route prefix wins)."""
+        best = None
+        for prefix in self.routes:
+            if key.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return self.shards[self.routes[best] if best is not None else self.DEFAULT_SHARD]
+
+    def _shards_for_prefix(self, prefix: Optional[str]) -> List[MemoryLayer]:
+        """Shards that can hold keys starting with prefix."""
+        if not prefix:
+            return list(self.shards.values())
+        names = {id(self.shard_for(prefix)): self.shard_for(prefix)}
+        # More specific routes under the prefix live in their own shards
+        for route, name in self.routes.items():
+            if route.startswith(prefix):
+                names[id(self.shards[name])] = self.shards[name]
+        return list(names.values())
+
+    def _fan_out(self, shards: Sequence[MemoryLayer], func: Callable[[MemoryLayer], Any]) -> List[Any]:
+        """Run func on each shard in parallel, results in shard order."""
+        if len(shards) == 1:
+            return [func(shards[0])]
+        return list(self._pool.map(func, shards))
+
+    # === Per-key operations ===
+
+    def add(self, key: str, value: str, metadata: Optional[Dict[str, Any]] = None,
+            embedding: Optional[Sequence[float]] = None, ttl: Optional[float] = None) -> bool:
+        """Add or update a memory entry in its shard (see MemoryLayer.add)."""
+        return self.shard_for(key).add(key, value, metadata, embedding=embedding, ttl=ttl)
+
+    def add_many(self, items: Iterable[MemoryItem], chunk_size: int = 1000) -> int:
+        """Add many entries, one transaction per shard (see MemoryLayer.add_many).
+        
+        Returns:
+            Number of entries written.
+        """
+        grouped: Dict[int, Tuple[MemoryLayer, List[MemoryItem]]] = {}
+        for item in items:
+            shard = self.shard_for(item["key"] if isinstance(item, dict) else item[0])
+            grouped.setdefault(id(shard), (shard, []))[1].append(item)
+        groups = list(grouped.values())
+        written = self._fan_out(
+            [shard for shard, _ in groups],
+            lambda shard: shard.add_many(grouped[id(shard)][1], chunk_size)
+        )
+        return sum(written)
+
+    def get(self, key: str) -> Optional[MemoryEntry]:
+        """Get a memory entry from its shard."""
+        return self.shard_for(key).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, MemoryEntry]:
+        """Get several entries, one batched lookup per shard."""
+        grouped: Dict[int, Tuple[MemoryLayer, List[str]]] = {}
+        for key in keys:
+            shard = self.shard_for(key)
+            grouped.setdefault(id(shard), (shard, []))[1].append(key)
+        found: Dict[str, MemoryEntry] = {}
+        for result in self._fan_out(
+            [shard for shard, _ in grouped.values()],
+            lambda shard: shard.get_many(grouped[id(shard)][1])
+        ):
+            found.update(result)
+        return found
+
+    def set_embedding(self, key: str, embedding: Sequence[float]) -> bool:
+        """Attach an embedding to an existing memory in its shard."""
+        return self.shard_for(key).set_embedding(key, embedding)
+
+    def delete(self, key: str) -> bool:
+        """Delete a memory entry from its shard."""
+        return self.shard_for(key).delete(key)
+
+    # === Fan-out queries ===
+
+    def list_keys(self, prefix: Optional[str] = None, limit: int = 100) -> List[str]:
+        """List memory keys across shards, newest first."""
+        return [entry["key"] for entry in self.scan(prefix, limit=limit)]
+
+    def scan(self, prefix: Optional[str] = None, with_values: bool = True,
+             limit: Optional[int] = None) -> Union[List[MemoryEntry], List[str]]:
+        """List memories under a key prefix across shards, newest first.
+        
+        Args:
+            prefix: Optional key prefix filter
+            with_values: Return full MemoryEntry objects instead of just keys
+            limit: Maximum entries to return (None = all)
+        
+        Returns:
+            List of MemoryEntry objects, or of keys if with_values is False.
+        """
+        results = self._fan_out(
+            self._shards_for_prefix(prefix), lambda shard: shard.scan(prefix, True, limit)
+        )
+        merged = self._merge(results, lambda entry: entry["updated_at"], True, limit)
+        return merged if with_values else [entry["key"] for entry in merged]
+
+    def scan_page(self, prefix: Optional[str] = None, after: Optional[str] = None,
+                  limit: int = 1000, with_values: bool = False
+                  ) -> Tuple[Union[List[MemoryEntry], List[str]], Optional[str]]:
+        """Fetch one page of memories in key order across shards.
+        
+        Each shard returns its own next page after the cursor; merging
+        them by key and keeping the first ``limit`` gives the global page.
+        
+        Returns:
+            (entries, next_cursor) - next_cursor is None on the last page.
+        """
+        results = self._fan_out(
+            self._shards_for_prefix(prefix),
+            lambda shard: shard.scan_page(prefix, after, limit, with_values)[0]
+        )
+        sort_key = (lambda entry: entry["key"]) if with_values else None
+        page = self._merge(results, sort_key, False, limit)
+        if len(page) < limit:
+            return page, None
+        return page, page[-1]["key"] if with_values else page[-1]
+
+    def iter_scan(self, prefix: Optional[str] = None, with_values: bool = False,
+                  page_size: int = 1000) -> Iterator[Union[Dict[str, Any], str]]:
+        """Iterate over every matching memory across shards in key order."""
+        after = None
+        while True:
+            entries, after = self.scan_page(prefix, after, page_size, with_values)
+            yield from entries
+            if after is None:
+                return
+
+    def iter_export(self, prefix: Optional[str] = None,
+                    page_size: int = 1000) -> Iterator[MemoryEntry]:
+        """Stream all memories across shards in key order."""
+        return self.iter_scan(prefix, with_values=True, page_size=page_size)
+
+    def search(self, query: str, limit: int = 10) -> List[MemoryEntry]:
+        """Full-text search across shards.
+        
+        BM25 scores depend on each shard's own term statistics and are not
+        comparable between shards, so per-shard rankings are interleaved
+        round-robin (each shard's best match, then each second best, ...).
+        """
+        results = self._fan_out(
+            list(self.shards.values()), lambda shard: shard.search(query, limit)
+        )
+        merged = []
+        for rank in range(limit):
+            for entries in results:
+                if rank < len(entries):
+                    merged.append(entries[rank])
+        return merged[:limit]
+
+    def semantic_search(self, query_vector: Sequence[float], k: int = 10,
+                        exact: bool = False) -> List[MemoryEntry]:
+        """Nearest-neighbour search across shards, merged by cosine score."""
+        results = self._fan_out(
+            list(self.shards.values()),
+            lambda shard: shard.semantic_search(query_vector, k, exact)
+        )
+        return self._merge(results, lambda entry: entry["score"], True, k)
+
+    def query(self, where: Optional[Dict[str, Any]] = None, prefix: Optional[str] = None,
+              since: Optional[Union[datetime, str]] = None,
+              until: Optional[Union[datetime, str]] = None,
+              order_by: str = "-updated_at", limit: Optional[int] = 100) -> List[MemoryEntry]:
+        """Filter memories by metadata across shards (see MemoryLayer.query)."""
+        results = self._fan_out(
+            self._shards_for_prefix(prefix),
+            lambda shard: shard.query(where, prefix, since, until, order_by, limit)
+        )
+        field = order_by.lstrip("-")
+        if field in MemoryLayer.QUERY_ORDER_COLUMNS:
+            sort_key = lambda entry: entry[field]
+        else:
+            sort_key = lambda entry: _sql_order(_metadata_value(entry["metadata"], field))
+        return self._merge(results, sort_key, order_by.startswith("-"), limit)
+
+    def get_recent(self, limit: int = 10) -> List[MemoryEntry]:
+        """Get the most recently updated memories across shards."""
+        results = self._fan_out(
+            list(self.shards.values()), lambda shard: shard.get_recent(limit)
+        )
+        return self._merge(results, lambda entry: entry["updated_at"], True, limit)
+
+    def count(self) -> int:
+        """Get the total number of memory entries across shards."""
+        return sum(self._fan_out(list(self.shards.values()), lambda shard: shard.count()))
+
+    @staticmethod
+    def _merge(results: List[List[Any]], sort_key: Optional[Callable[[Any], Any]],
+               descending: bool, limit: Optional[int]) -> List[Any]:
+        """Merge per-shard lists that are each already sorted by sort_key."""
+        merged = heapq.merge(*results, key=sort_key, reverse=descending)
+        return list(merged if limit is None else islice(merged, limit))
+
+    # === Maintenance ===
+
+    def index_metadata(self, field: str) -> None:
+        """Index a hot metadata field in every shard (see MemoryLayer.index_metadata)."""
+        for shard in self.shards.values():
+            shard.index_metadata(field)
+
+    def set_quota(self, prefix: str, max_entries: Optional[int], policy: str = "lru") -> None:
+        """Cap a namespace's size in the shard(s) that hold it (see MemoryLayer.set_quota)."""
+        for shard in self._shards_for_prefix(prefix):
+            shard.set_quota(prefix, max_entries, policy)
+
+    def sweep(self, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """Run one cleanup step on every shard and sum the counts."""
+        totals: Dict[str, int] = {}
+        for stats in self._fan_out(
+            list(self.shards.values()), lambda shard: shard.sweep(batch_size)
+        ):
+            for name, value in stats.items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def flush(self) -> int:
+        """Flush write-behind buffers of every shard."""
+        return sum(shard.flush() for shard in self.shards.values())
+
+    def clear(self) -> None:
+        """Clear all memories in every shard."""
+        for shard in self.shards.values():
+            shard.clear()
+
+    def close(self) -> None:
+        """Close every shard and stop the fan-out threads."""
+        self._pool.shutdown(wait=True)
+        for shard in self.shards.values():
+            shard.close()
+
+    def __enter__(self) -> "ShardedMemoryLayer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _metadata_value(metadata: Optional[Dict[str, Any]], field: str) -> Any:
+    """Read a dotted metadata field from a decoded entry (None if missing)."""
+    value: Any = metadata
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _sql_order(value: Any) -> Tuple[int, Any]:
+    """Sort key that orders Python values the way SQLite orders json_extract()."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (bool, int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    # Objects and arrays come back from json_extract() as minified JSON text
+    return (2, json.dumps(value, separators=(",", ":")))
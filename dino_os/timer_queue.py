@@ -0,0 +1,271 @@
+"""Timer Queue - Due-time ordering of scheduled jobs for Dino Dynasty OS."""
+
+import heapq
+import itertools
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Entries are (due time, job); jobs are identified by their ``id``
+Entry = Tuple[datetime, Any]
+
+
+class TimerQueue(ABC):
+    """Holds at most one pending due time per job and hands out due jobs."""
+
+    @abstractmethod
+    def push(self, when: datetime, job: Any) -> None:
+        """Schedule a job, replacing its pending entry if it has one.
+        
+        Args:
+            when: Due time (naive UTC)
+            job: Object with an ``id`` attribute
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def discard(self, job_id: str) -> None:
+        """Cancel a job's pending entry (no-op if there is none)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def pop_due(self, now: datetime) -> Optional[Entry]:
+        """Remove and return one entry due at or before now, or None."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def peek(self) -> Optional[datetime]:
+        """Earliest time pop_due may return something (None if empty)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of pending entries."""
+        raise NotImplementedError
+
+
+class HeapTimerQueue(TimerQueue):
+    """Binary min-heap: O(log n) push and pop, lazy O(1) cancel.
+    
+    Cancelled and superseded entries stay in the heap and are skipped when
+    they surface; the heap is rebuilt once they outnumber live entries.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int, Any]] = []
+        self._live: Dict[str, Tuple[datetime, int]] = {}  # job id -> its valid entry
+        self._counter = itertools.count()
+
+    def push(self, when: datetime, job: Any) -> None:
+        seq = next(self._counter)
+        self._live[job.id] = (when, seq)
+        heapq.heappush(self._heap, (when, seq, job))
+        self._compact()
+
+    def discard(self, job_id: str) -> None:
+        if self._live.pop(job_id, None) is not None:
+            self._compact()
+
+    def pop_due(self, now: datetime) -> Optional[Entry]:
+        heap, live = self._heap, self._live
+        while heap and heap[0][0] <= now:
+            when, seq, job = heapq.heappop(heap)
+            if live.get(job.id) == (when, seq):
+                del live[job.id]
+                return when, job
+        return None
+
+    def peek(self) -> Optional[datetime]:
+        heap, live = self._heap, self._live
+        while heap and live.get(heap[0][2].id) != heap[0][:2]:
+            heapq.heappop(heap)  # drop stale entries so the head is real
+        return heap[0][0] if heap else None
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def _compact(self) -> None:
+        """Rebuild the heap once stale entries outnumber live ones."""
+        if len(self._heap) > 2 * len(self._live) + 64:
+            live = self._live
+            self._heap = [entry for entry in self._heap if live.get(entry[2].id) == entry[:2]]
+            heapq.heapify(self._heap)
+
+
+class TimingWheel(TimerQueue):
+    """Hashed hierarchical timing wheel: O(1) push and cancel.
+    
+    Time is cut into ticks of ``resolution`` seconds. Level 0 has one slot
+    per tick for the next ``slots`` ticks; each higher level has slots
+    covering a whole revolution of the level below. Entries are filed by
+    absolute due tick, and a higher-level slot is cascaded down when the
+    clock reaches the start of the span it covers. Due times are rounded
+    up to the next tick, so jobs never run early and run at most one tick
+    late. Stretches with nothing at the lower levels are skipped whole,
+    so a long idle sleep costs nothing per tick.
+    """
+
+    EPOCH = datetime(1970, 1, 1)
+
+    def __init__(self, resolution: float = 0.01, slots: int = 256, levels: int = 4):
+        """Initialize the wheel.
+        
+        Args:
+            resolution: Seconds per tick
+            slots: Slots per level (a power of two)
+            levels: Number of levels; the wheels span slots**levels ticks
+                (about 497 days with the defaults), later entries wait
+                in an overflow list
+        """
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError("slots must be a power of two")
+        self.resolution = timedelta(seconds=resolution)
+        self.levels = levels
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._wheels: List[List[Dict[str, Tuple[int, datetime, Any]]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._counts = [0] * levels
+        self._overflow: Dict[str, Tuple[int, datetime, Any]] = {}
+        # job id -> (level, slot); level -1 = overflow, -2 = expired (slot
+        # is then a token matching the entry's place in _due)
+        self._where: Dict[str, Tuple[int, int]] = {}
+        self._due: Deque[Tuple[datetime, Any, int]] = deque()
+        self._tokens = itertools.count()
+        self._current = self._floor_tick(datetime.utcnow())
+
+    def push(self, when: datetime, job: Any) -> None:
+        self.discard(job.id)
+        self._insert(-((self.EPOCH - when) // self.resolution), when, job)  # ceil
+
+    def discard(self, job_id: str) -> None:
+        location = self._where.pop(job_id, None)
+        if location is None:
+            return
+        level, slot = location
+        if level == -1:
+            del self._overflow[job_id]
+        elif level >= 0:
+            del self._wheels[level][slot][job_id]
+            self._counts[level] -= 1
+
+    def pop_due(self, now: datetime) -> Optional[Entry]:
+        while True:
+            if self._due:
+                when, job, token = self._due.popleft()
+                if self._where.get(job.id) == (-2, token):  # not cancelled or replaced
+                    del self._where[job.id]
+                    return when, job
+                continue
+            target = self._floor_tick(now)
+            if self._current >= target:
+                return None
+            self._advance(target)
+
+    def peek(self) -> Optional[datetime]:
+        if self._due:
+            return self.EPOCH + self.resolution * self._current
+        tick = self._next_event_tick()
+        return None if tick is None else self.EPOCH + self.resolution * tick
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def _floor_tick(self, when: datetime) -> int:
+        return (when - self.EPOCH) // self.resolution
+
+    def _insert(self, tick: int, when: datetime, job: Any) -> None:
+        """File an entry by its due tick relative to the current tick."""
+        delta = tick - self._current
+        if delta <= 0:
+            self._expire(when, job)
+            return
+        for level in range(self.levels):
+            if delta < 1 << (self._bits * (level + 1)):
+                slot = (tick >> (self._bits * level)) & self._mask
+                self._wheels[level][slot][job.id] = (tick, when, job)
+                self._counts[level] += 1
+                self._where[job.id] = (level, slot)
+                return
+        self._overflow[job.id] = (tick, when, job)
+        self._where[job.id] = (-1, 0)
+
+    def _advance(self, target: int) -> None:
+        """Move the clock to target, expiring and cascading entries on the way."""
+        bits, mask, counts = self._bits, self._mask, self._counts
+        while self._current < target:
+            if not counts[0]:
+                # Nothing can expire before the next boundary of the lowest
+                # non-empty level, so jump to just before it
+                level = 1
+                while level < self.levels and not counts[level]:
+                    level += 1
+                if level == self.levels and not self._overflow:
+                    self._current = target
+                    return
+                span = 1 << (bits * min(level, self.levels))
+                boundary = (self._current // span + 1) * span
+                if boundary > target:
+                    self._current = target
+                    return
+                self._current = boundary - 1
+
+            tick = self._current = self._current + 1
+            if not tick & mask:
+                # Cascade from the highest level whose boundary this is
+                top = 1
+                while top < self.levels and not tick & ((1 << (bits * (top + 1))) - 1):
+                    top += 1
+                if top == self.levels:
+                    self._cascade(self._overflow)
+                for level in range(min(top, self.levels - 1), 0, -1):
+                    self._cascade(self._wheels[level][(tick >> (bits * level)) & mask], level)
+
+            slot = self._wheels[0][tick & mask]
+            if slot:
+                counts[0] -= len(slot)
+                for _, when, job in slot.values():
+                    self._expire(when, job)
+                slot.clear()
+            if self._due:
+                return  # let the caller drain before moving on
+
+    def _expire(self, when: datetime, job: Any) -> None:
+        token = next(self._tokens)
+        self._due.append((when, job, token))
+        self._where[job.id] = (-2, token)
+
+    def _cascade(self, bucket: Dict[str, Tuple[int, datetime, Any]], level: int = -1) -> None:
+        """Re-file a slot's entries now that the clock has reached its span."""
+        if not bucket:
+            return
+        entries = list(bucket.values())
+        bucket.clear()
+        if level >= 0:
+            self._counts[level] -= len(entries)
+        for tick, when, job in entries:
+            self._insert(tick, when, job)
+
+    def _next_event_tick(self) -> Optional[int]:
+        """First future tick at which an entry expires or is cascaded.
+        
+        An entry on a higher level may be due before the first one on a
+        lower level, so every level's earliest slot is considered.
+        """
+        bits, mask = self._bits, self._mask
+        candidates = []
+        for level in range(self.levels):
+            if not self._counts[level]:
+                continue
+            wheel = self._wheels[level]
+            block = self._current >> (bits * level)
+            for offset in range(1, mask + 2):
+                if wheel[(block + offset) & mask]:
+                    candidates.append((block + offset) << (bits * level))
+                    break
+        if self._overflow:
+            span = 1 << (bits * self.levels)
+            candidates.append((self._current // span + 1) * span)
+        return min(candidates) if candidates else None
@@ -0,0 +1,226 @@
+"""Vector Index - Embedding storage and nearest-neighbour search for Dino Dynasty OS."""
+
+import heapq
+import math
+from abc import ABC, abstractmethod
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def encode_vector(vector: Sequence[float]) -> bytes:
+    """Pack a vector into a compact float32 BLOB (4 bytes per dimension)."""
+    if np is not None and isinstance(vector, np.ndarray):
+        return vector.astype(np.float32).tobytes()
+    return array('f', vector).tobytes()
+
+
+def decode_vector(blob: bytes) -> array:
+    """Unpack a float32 BLOB written by encode_vector."""
+    vector = array('f')
+    vector.frombytes(blob)
+    return vector
+
+
+class VectorIndex(ABC):
+    """Cosine-similarity index over (id, vector) pairs of one dimension."""
+
+    def __init__(self, dim: int):
+        """Initialize the index.
+        
+        Args:
+            dim: Vector dimension
+        """
+        self.dim = dim
+        self.size = 0
+
+    @abstractmethod
+    def build(self, ids: List[int], blobs: List[bytes]) -> None:
+        """Replace the index contents.
+        
+        Args:
+            ids: Memory row ids
+            blobs: float32 BLOBs, aligned with ids
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        """Find the k most similar vectors.
+        
+        Args:
+            query: Query vector
+            k: Number of neighbours
+        
+        Returns:
+            (id, cosine similarity) pairs, best first.
+        """
+        raise NotImplementedError
+
+
+class BruteForceIndex(VectorIndex):
+    """Exact search: one matrix-vector product (NumPy) or a Python scan."""
+
+    def __init__(self, dim: int):
+        super().__init__(dim)
+        self._ids: List[int] = []
+        self._matrix = None  # (n, dim) float32 with unit-length rows
+        self._vectors: List[Tuple[int, List[float]]] = []  # pure-Python fallback
+
+    def build(self, ids: List[int], blobs: List[bytes]) -> None:
+        self.size = len(ids)
+        if np is not None:
+            self._ids = list(ids)
+            self._matrix = _normalize_rows(_blobs_to_matrix(blobs, self.dim))
+            return
+        self._vectors = []
+        for memory_id, blob in zip(ids, blobs):
+            vector = decode_vector(blob)
+            norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+            self._vectors.append((memory_id, [x / norm for x in vector]))
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        if self.size == 0 or k <= 0:
+            return []
+        if np is not None:
+            return _top_k(self._ids, self._matrix, _normalize(query), k)
+        norm = math.sqrt(sum(x * x for x in query)) or 1.0
+        unit = [x / norm for x in query]
+        scored = (
+            (memory_id, sum(a * b for a, b in zip(unit, vector)))
+            for memory_id, vector in self._vectors
+        )
+        return heapq.nlargest(k, scored, key=lambda pair: pair[1])
+
+
+class IVFIndex(VectorIndex):
+    """Approximate search with an inverted file of k-means clusters.
+    
+    Vectors are bucketed under their nearest centroid; a query only scans
+    the ``nprobe`` buckets whose centroids are closest to it. Requires NumPy.
+    """
+
+    def __init__(self, dim: int, nprobe: int = 8, nlist: Optional[int] = None,
+                 train_iterations: int = 10, seed: int = 0):
+        """Initialize the index.
+        
+        Args:
+            dim: Vector dimension
+            nprobe: Buckets scanned per query (higher = better recall)
+            nlist: Number of buckets (defaults to ~sqrt(n))
+            train_iterations: k-means iterations when training centroids
+            seed: Random seed for centroid initialisation
+        """
+        super().__init__(dim)
+        self.nprobe = nprobe
+        self.nlist = nlist
+        self.train_iterations = train_iterations
+        self.seed = seed
+        self.trained_size = 0
+        self._centroids = None
+        self._lists: List[Tuple[List[int], object]] = []
+
+    def build(self, ids: List[int], blobs: List[bytes]) -> None:
+        if np is None:
+            raise RuntimeError("IVFIndex requires numpy (pip install numpy)")
+        matrix = _normalize_rows(_blobs_to_matrix(blobs, self.dim))
+        self.size = len(ids)
+        # Keep trained centroids until the data has doubled or halved
+        if (self._centroids is None or self.size > 2 * self.trained_size
+                or self.size < self.trained_size // 2):
+            self._train(matrix)
+        assignments = np.argmax(matrix @ self._centroids.T, axis=1) if self.size else []
+        ids_array = np.asarray(ids, dtype=np.int64)
+        self._lists = []
+        for bucket in range(len(self._centroids)):
+            mask = assignments == bucket
+            self._lists.append((ids_array[mask].tolist(), matrix[mask]))
+
+    def _train(self, matrix) -> None:
+        """Fit centroids with spherical k-means on a sample of the data."""
+        nlist = self.nlist or max(1, int(math.sqrt(self.size)))
+        nlist = max(1, min(nlist, self.size))
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(self.size, nlist * 64)
+        sample = matrix[rng.choice(self.size, sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(self.train_iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalize_rows(sums)
+        self._centroids = centroids
+        self.trained_size = self.size
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        if self.size == 0 or k <= 0:
+            return []
+        unit = _normalize(query)
+        nprobe = min(self.nprobe, len(self._lists))
+        probes = np.argpartition(-(self._centroids @ unit), nprobe - 1)[:nprobe]
+        ids: List[int] = []
+        blocks = []
+        for bucket in probes:
+            bucket_ids, bucket_matrix = self._lists[bucket]
+            ids.extend(bucket_ids)
+            blocks.append(bucket_matrix)
+        if not ids:
+            return []
+        return _top_k(ids, np.concatenate(blocks), unit, k)
+
+
+def build_index(dim: int, ids: List[int], blobs: List[bytes],
+                ivf_threshold: int, nprobe: int,
+                previous: Optional[VectorIndex] = None) -> VectorIndex:
+    """Pick and build the right index for the data size.
+    
+    Args:
+        dim: Vector dimension
+        ids: Memory row ids
+        blobs: float32 BLOBs, aligned with ids
+        ivf_threshold: Minimum vector count for an IVF index
+        nprobe: Buckets scanned per IVF query
+        previous: Index being replaced; IVF centroids are reused from it
+    
+    Returns:
+        A built VectorIndex.
+    """
+    if np is not None and len(ids) >= ivf_threshold:
+        index = previous if isinstance(previous, IVFIndex) else IVFIndex(dim, nprobe=nprobe)
+        index.nprobe = nprobe
+    else:
+        index = BruteForceIndex(dim)
+    index.build(ids, blobs)
+    return index
+
+
+def _blobs_to_matrix(blobs: List[bytes], dim: int):
+    """Stack float32 BLOBs into an (n, dim) array without per-row copies."""
+    return np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), dim)
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+def _normalize(vector: Sequence[float]):
+    unit = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(unit)
+    return unit / norm if norm else unit
+
+
+def _top_k(ids: List[int], matrix, unit, k: int) -> List[Tuple[int, float]]:
+    """Exact top-k by dot product over unit-length rows."""
+    scores = matrix @ unit
+    k = min(k, len(ids))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [(ids[i], float(scores[i])) for i in top]
@@ -93,7 +93,7 @@ class AutonomousResearcherAgent(Agent):
                     'timestamp': now.isoformat(),
                     'summary': summary,
                     'results_count': len(results)
-                }))
+                }), metadata={'agent': self.name, 'topic': topic})
                 
                 print(f"   ✅ Found {len(results)} results")
                 print(f"   📝 Summary saved to memory: {memory_key}")
@@ -190,19 +190,17 @@ class AutonomousResearcherAgent(Agent):
         
         if topic:
             # Search for specific topic
-            keys = self.memory.list_keys(prefix=f"research_{topic}")
+            entries = self.memory.scan(prefix=f"research_{topic}")
         else:
             # Get all research
-            keys = self.memory.list_keys(prefix="research_")
-        
-        for key in keys:
-            entry = self.memory.get(key)
-            if entry:
-                try:
-                    data = json.loads(entry['value'])
-                    results.append(data)
-                except:
-                    pass
+            entries = self.memory.scan(prefix="research_")
+        
+        for entry in entries:
+            try:
+                data = json.loads(entry['value'])
+                results.append(data)
+            except:
+                pass
         
         return sorted(results, key=lambda x: x.get('timestamp', ''), reverse=True)
     
@@ -275,7 +275,12 @@ class AutonomousTesterAgent(Agent):
             'file': str(test_file),
             'success': success,
             'timestamp': datetime.now().isoformat()
-        }))
+        }), metadata={
+            'agent': self.name,
+            'file': str(test_file),
+            'success': success,
+            'exit_code': exit_code
+        })
     
     async def _generate_report(self):
         """Generate and display test report."""
@@ -297,18 +302,16 @@ class AutonomousTesterAgent(Agent):
     
     def get_test_history(self) -> List[Dict]:
         """Get test history from memory."""
-        keys = self.memory.list_keys(prefix="test_result_")
+        entries = self.memory.scan(prefix="test_result_")
         history = []
         
-        for key in keys:
-            entry = self.memory.get(key)
-            if entry:
-                try:
-                    import ast
-                    data = ast.literal_eval(entry['value'])
-                    history.append(data)
-                except:
-                    pass
+        for entry in entries:
+            try:
+                import ast
+                data = ast.literal_eval(entry['value'])
+                history.append(data)
+            except:
+                pass
         
         return sorted(history, key=lambda x: x.get('timestamp', ''), reverse=True)
     